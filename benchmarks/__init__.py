@@ -0,0 +1,4 @@
+"""Benchmarks for the CYGNO datasets and data processing utilities.
+
+Run with ``python -m benchmarks`` from the project root, see ``__main__.py``.
+"""
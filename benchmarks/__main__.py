@@ -0,0 +1,73 @@
+"""Command line entry point of the benchmark suite.
+
+Examples::
+
+    # compare against the stored baseline, failing on >50% slowdowns
+    python -m benchmarks --tolerance 1.5
+
+    # refresh the stored baseline after an intended change
+    python -m benchmarks --save-baseline
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from .suite import SIZES, compare, run_suite
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+logger = logging.getLogger("benchmarks")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--sizes", nargs="+", choices=sorted(SIZES), default=list(SIZES)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="Also write the results here.")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    results = run_suite({name: SIZES[name] for name in args.sizes}, args.repeat)
+    for name, cases in results.items():
+        for case, result in cases.items():
+            logger.info(
+                "%-8s %-28s %12.6f s %14.1f events/s",
+                name,
+                case,
+                result["seconds"],
+                result["events_per_second"],
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        )
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2))
+        logger.info("Saved baseline to %s", args.baseline)
+        return 0
+    if not args.baseline.exists():
+        logger.warning("No baseline at %s, run with --save-baseline", args.baseline)
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for name, case, ratio in regressions:
+        logger.error(
+            "Regression: %s %s is %.2fx slower than baseline", name, case, ratio
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
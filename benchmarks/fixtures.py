@@ -0,0 +1,42 @@
+"""Synthetic CYGNO-like input files.
+
+Simulations are written with ``h5py`` as one sparse int16 track image per key,
+noise runs with ``uproot`` as one TH2 pedestal frame per key, mirroring the
+layout of the raw ``simulation.*`` and ``noise.*`` catalog entries.
+"""
+from pathlib import Path
+from typing import Union
+
+import h5py
+import numpy as np
+import uproot
+
+
+def write_simulation(
+    path: Union[str, Path], n_events: int = 8, size: int = 64, seed: int = 0
+) -> Path:
+    """Writes an HDF5 file with one sparse int16 track image per key."""
+    rng = np.random.default_rng(seed)
+    track = max(size // 16, 4)
+    with h5py.File(path, "w") as file:
+        for ev in range(n_events):
+            image = np.zeros((size, size), dtype=np.int16)
+            x, y = rng.integers(size // 4, 3 * size // 4, size=2)
+            image[x : x + track, y : y + 2 * track] = rng.integers(
+                1, 200, size=(track, 2 * track)
+            )
+            file.create_dataset(f"event_{ev:05d}", data=image)
+    return Path(path)
+
+
+def write_noise(
+    path: Union[str, Path], n_events: int = 8, size: int = 64, seed: int = 1
+) -> Path:
+    """Writes a ROOT file with one TH2 pedestal frame per key."""
+    rng = np.random.default_rng(seed)
+    edges = np.arange(size + 1, dtype=np.float64)
+    with uproot.recreate(path) as file:
+        for ev in range(n_events):
+            counts = rng.normal(100, 3, size=(size, size)).round()
+            file[f"pic_run00001_ev{ev}"] = (counts, edges, edges)
+    return Path(path)
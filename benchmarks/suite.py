@@ -0,0 +1,186 @@
+"""Benchmark cases for dataset access, augmentation and generation.
+
+Every case is timed on synthetic files of a given number of events and image
+size. Results are reported per call and, where a call handles several events,
+as events per second.
+"""
+import random
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from cygunet.datasets import CygnoNoiseImage, CygnoSimulationImage
+from cygunet.datasets.bulk import load_files
+from cygunet.datasets.rebin import rebin
+from cygunet.pipelines.data_processing.nodes import generate_data
+from cygunet.pipelines.data_processing.utils import (
+    cut_edges,
+    make_training_pair,
+    overlay_noise,
+    random_rotate,
+    random_translate,
+)
+
+from .fixtures import write_noise, write_simulation
+
+# name -> (number of events, image size)
+SIZES = {
+    "small": (16, 256),
+    "medium": (32, 512),
+    "large": (32, 1024),
+}
+
+# Files opened by the bulk loading cases, 4 events each.
+BULK_FILES = 16
+
+
+def _cases(
+    directory: Path, n_events: int, size: int
+) -> Dict[str, Tuple[Callable, int]]:
+    """Builds the benchmark cases as ``name -> (function, events per call)``."""
+    simulation_path = str(write_simulation(directory / "simulation.h5", n_events, size))
+    noise_path = str(write_noise(directory / "noise.root", n_events, size))
+    simulation = CygnoSimulationImage(simulation_path).load()
+    noise = CygnoNoiseImage(noise_path).load()
+    image, frame = simulation[0], noise[0]
+    edges = (size // 8, size - size // 8, size // 8, size - size // 8)
+    max_translation = size // 10
+    rng = random.Random(0)
+    indices = [rng.randrange(n_events) for _ in range(n_events)]
+    bulk = {
+        "simulation": (
+            CygnoSimulationImage,
+            [
+                str(write_simulation(directory / f"bulk_{i}.h5", 4, size, seed=i))
+                for i in range(BULK_FILES)
+            ],
+        ),
+        "noise": (
+            CygnoNoiseImage,
+            [
+                str(write_noise(directory / f"bulk_{i}.root", 4, size, seed=i))
+                for i in range(BULK_FILES)
+            ],
+        ),
+    }
+
+    cases = {
+        "load_simulation": (lambda: CygnoSimulationImage(simulation_path).load(), 1),
+        "load_noise": (lambda: CygnoNoiseImage(noise_path).load(), 1),
+        "random_access_simulation": (
+            lambda: [simulation[i] for i in indices],
+            n_events,
+        ),
+        "random_access_noise": (lambda: [noise[i] for i in indices], n_events),
+        "batched_access_simulation": (
+            lambda: np.stack([simulation[i] for i in range(n_events)]),
+            n_events,
+        ),
+        "batched_access_noise": (
+            lambda: np.stack([noise[i] for i in range(n_events)]),
+            n_events,
+        ),
+        "random_translate": (lambda: random_translate(image, max_translation), 1),
+        "random_rotate": (lambda: random_rotate(image), 1),
+        "cut_edges": (lambda: cut_edges(image, *edges), 1),
+        "overlay_noise": (lambda: overlay_noise(image, frame), 1),
+        "rebin_8x": (lambda: rebin(image, 8), 1),
+        "make_training_pair": (
+            lambda: make_training_pair(image, frame, max_translation, edges),
+            1,
+        ),
+        "generate_data": (
+            lambda: generate_data(
+                [simulation],
+                [noise],
+                (0, n_events),
+                (0, n_events),
+                max_translation,
+                edges,
+                n_events,
+            ),
+            n_events,
+        ),
+    }
+    # Bulk loads only beat sequential ones where opening a file releases the
+    # GIL, see cygunet.datasets.bulk
+    for source, (dataset_type, filepaths) in bulk.items():
+        cases[f"sequential_load_{source}_files"] = (
+            partial(_load_sequential, dataset_type, filepaths),
+            BULK_FILES,
+        )
+        cases[f"bulk_load_{source}_files"] = (
+            partial(load_files, dataset_type, filepaths),
+            BULK_FILES,
+        )
+    return cases
+
+
+def _load_sequential(dataset_type, filepaths: List[str]) -> List:
+    """Loads and warms the files one after another, as ``load_files`` does concurrently."""
+    loaded = []
+    for filepath in filepaths:
+        data = dataset_type(filepath=filepath).load()
+        data[0]
+        loaded.append(data)
+    return loaded
+
+
+def _time(func: Callable, repeat: int) -> float:
+    """Returns the best time per call over ``repeat`` autoranged measurements."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_suite(
+    sizes: Dict[str, Tuple[int, int]] = SIZES, repeat: int = 5
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Runs every benchmark case for every data size.
+
+    Args:
+        sizes: Mapping of size name to ``(number of events, image size)``.
+        repeat: Number of measurements the best time is taken from.
+    Returns:
+        ``size name -> case name -> {"seconds", "events_per_second"}``.
+    """
+    random.seed(0)
+    np.random.seed(0)
+    results = {}
+    for name, (n_events, size) in sizes.items():
+        with tempfile.TemporaryDirectory() as directory:
+            cases = _cases(Path(directory), n_events, size)
+            results[name] = {}
+            for case, (func, events) in cases.items():
+                seconds = _time(func, repeat)
+                results[name][case] = {
+                    "seconds": seconds,
+                    "events_per_second": events / seconds,
+                }
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float,
+) -> List[Tuple[str, str, float]]:
+    """Lists the cases slower than the baseline by more than ``tolerance``.
+
+    Returns:
+        ``(size name, case name, slowdown ratio)`` of every regression. Cases
+        missing from the baseline are ignored.
+    """
+    regressions = []
+    for name, cases in results.items():
+        for case, result in cases.items():
+            reference = baseline.get(name, {}).get(case)
+            if reference is None:
+                continue
+            ratio = result["seconds"] / reference["seconds"]
+            if ratio > tolerance:
+                regressions.append((name, case, ratio))
+    return regressions
@@ -1 +1,4 @@
-from .cygno_data import CygnoSimulationImage, CygnoNoiseImage
\ No newline at end of file
+from .cygno_data import CygnoSimulationImage, CygnoNoiseImage
+from .image_stack import CygnoImageStack
+from .pyramid import CygnoPyramid
+from .bulk import load_datasets, load_files, match_factory
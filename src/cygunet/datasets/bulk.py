@@ -0,0 +1,150 @@
+"""Concurrent loading of many CYGNO files.
+
+These helpers open, index and warm many ``simulation.*`` or ``noise.*``
+datasets on a bounded thread pool driven by asyncio, and return the wrappers
+ready to use.
+
+Threads only overlap the time spent waiting for the storage, e.g. on a network
+filesystem or a cold page cache. Every h5py call holds h5py's global lock, so
+HDF5 opens are serialised and only ROOT opens, whose reads release the GIL,
+overlap. On local files already in the page cache a bulk load is no faster
+than a sequential one; the ``*_load_*_files`` cases of ``benchmarks.suite``
+measure both. A process pool is not an option since the loaded wrappers hold
+open file handles, which cannot be sent back to the caller.
+"""
+import asyncio
+import glob
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Type
+
+from kedro.io import AbstractDataset
+
+
+def _warm(data: Any) -> Any:
+    """Reads the first event so the file metadata is cached before first use."""
+    try:
+        if len(data):
+            data[0]
+    except TypeError:
+        pass
+    return data
+
+
+async def aload(
+    loaders: Mapping[Hashable, Callable[[], Any]],
+    max_concurrency: int = 16,
+    warm: bool = True,
+) -> Dict[Hashable, Any]:
+    """Runs blocking loaders concurrently, at most ``max_concurrency`` at a time.
+
+    Args:
+        loaders: Functions returning the loaded data, keyed by name.
+        max_concurrency: Maximum number of files being opened at once.
+        warm: Whether to also read the first event of every loaded wrapper.
+    Returns:
+        The loaded data keyed by name, in the order of ``loaders``.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+
+        def load(loader: Callable[[], Any]) -> Any:
+            data = loader()
+            return _warm(data) if warm else data
+
+        values = await asyncio.gather(
+            *(loop.run_in_executor(pool, load, loader) for loader in loaders.values())
+        )
+    return dict(zip(loaders, values))
+
+
+def _run(
+    loaders: Mapping[Hashable, Callable[[], Any]], max_concurrency: int, warm: bool
+) -> Dict[Hashable, Any]:
+    """Runs ``aload`` to completion from synchronous code.
+
+    ``asyncio.run`` cannot be called while an event loop is running in this
+    thread, e.g. from a notebook or an async runner, so ``aload`` then gets its
+    own loop in a separate thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(aload(loaders, max_concurrency, warm))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, aload(loaders, max_concurrency, warm)).result()
+
+
+def load_files(
+    dataset_type: Type[AbstractDataset],
+    filepaths: Iterable[str],
+    max_concurrency: int = 16,
+    warm: bool = True,
+) -> List[Any]:
+    """Loads a dataset of ``dataset_type`` for every file concurrently.
+
+    Example::
+
+        simulations = load_files(CygnoSimulationImage, simulation_files)
+    """
+    loaders = {i: dataset_type(filepath=f).load for i, f in enumerate(filepaths)}
+    return list(_run(loaders, max_concurrency, warm).values())
+
+
+def match_factory(catalog_config: Mapping[str, Dict], pattern: str) -> List[str]:
+    """Lists the dataset names a factory pattern resolves to for the files on disk.
+
+    Example::
+
+        names = match_factory(config_loader["catalog"], "noise.{camera}_{runid}")
+        # ["noise.cam1_00001", "noise.cam1_00002", ...]
+
+    Args:
+        catalog_config: Catalog configuration, e.g. ``config_loader["catalog"]``.
+        pattern: Dataset factory pattern whose ``filepath`` uses the same placeholders.
+    Returns:
+        Sorted names of the datasets whose files exist.
+    """
+    filepath = catalog_config[pattern]["filepath"]
+    parts = re.split(r"\{(\w+)\}", filepath)
+    regex = "".join(
+        re.escape(part) if i % 2 == 0 else f"(?P<{part}>[^/]+)"
+        for i, part in enumerate(parts)
+    )
+    names = []
+    for path in glob.glob(re.sub(r"\{\w+\}", "*", filepath)):
+        match = re.fullmatch(regex, path)
+        if match:
+            names.append(pattern.format(**match.groupdict()))
+    return sorted(names)
+
+
+def load_datasets(
+    catalog,
+    names: Iterable[str],
+    max_concurrency: int = 16,
+    warm: bool = True,
+) -> Dict[str, Any]:
+    """Loads catalog datasets, e.g. resolved from dataset factories, concurrently.
+
+    Factory patterns are resolved up front, as resolving adds the datasets to
+    the catalog, then the loads run concurrently.
+
+    Example::
+
+        noise = load_datasets(catalog, match_factory(config, "noise.{camera}_{runid}"))
+
+    Args:
+        catalog: Kedro ``DataCatalog``.
+        names: Names of the datasets to load.
+        max_concurrency: Maximum number of files being opened at once.
+        warm: Whether to also read the first event of every loaded wrapper.
+    Returns:
+        The loaded wrappers keyed by dataset name.
+    """
+    names = list(names)
+    for name in names:
+        if not catalog.exists(name):
+            raise FileNotFoundError(f"Dataset {name} does not exist")
+    loaders = {name: (lambda name=name: catalog.load(name)) for name in names}
+    return _run(loaders, max_concurrency, warm)
@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 from pathlib import Path
 from kedro.io import AbstractDataset
-import h5py
-import pandas as pd
-from typing import Union
-import uproot
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    import h5py
+
+# h5py and uproot are imported on first load so that importing the catalog
+# datasets, e.g. in every pipeline or worker process, stays cheap.
 
 
 class LazyROOTData:
@@ -36,8 +41,19 @@ class LazyROOTData:
             raise AttributeError(f"{name} not found in ROOT file.")
 
     def __getitem__(self, index):
+        if isinstance(index, str):
+            return self._file[index].to_numpy()[0]
         return self._file[self.keys[index]].to_numpy()[0]
 
+    def __len__(self) -> int:
+        """
+        Returns the number of keys in the ROOT file.
+
+        Returns:
+            int: The number of keys.
+        """
+        return len(self.keys)
+
 
 class HDF5GroupWrapper:
     """
@@ -116,7 +132,7 @@ class HDF5GroupWrapper:
         return len(self.keys)
 
 
-class CygnoSimulationImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
+class CygnoSimulationImage(AbstractDataset[HDF5GroupWrapper, HDF5GroupWrapper]):
     """
     A Kedro dataset for managing simulation images stored in HDF5 format.
     """
@@ -135,6 +151,8 @@ class CygnoSimulationImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
         """
         Retrieves and stores the list of top-level keys from the HDF5 file.
         """
+        import h5py
+
         with h5py.File(self._filepath, 'r') as file:
             self._keys = list(file.keys())
             
@@ -145,6 +163,8 @@ class CygnoSimulationImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
         Returns:
             HDF5GroupWrapper: A wrapped HDF5 file ready for data interaction.
         """
+        import h5py
+
         self.get_keys()
         file = h5py.File(self._filepath, 'r')
         return HDF5GroupWrapper(file, self._keys)
@@ -177,7 +197,7 @@ class CygnoSimulationImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
         return dict()
 
 
-class CygnoNoiseImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
+class CygnoNoiseImage(AbstractDataset[LazyROOTData, LazyROOTData]):
     """
     A Kedro dataset for managing noise images stored in .root format.
     """
@@ -196,6 +216,8 @@ class CygnoNoiseImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
         """
         Retrieves and stores the list of top-level keys from the HDF5 file.
         """
+        import uproot
+
         with uproot.open(self._filepath) as file:
             self._keys = list(file.keys())
             
@@ -206,6 +228,8 @@ class CygnoNoiseImage(AbstractDataset[pd.DataFrame, pd.DataFrame]):
         Returns:
             LazyROOTData: A wrapped root file ready for data interaction.
         """
+        import uproot
+
         self.get_keys()
         file = uproot.open(self._filepath)
         return LazyROOTData(file, self._keys)
@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from kedro.io import AbstractDataset, DatasetError
+from numpy.typing import NDArray
+
+
+def _read_only(array: NDArray) -> NDArray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class CygnoImageStack(AbstractDataset[NDArray, NDArray]):
+    """
+    A Kedro dataset for passing ``(N, H, W)`` image stacks between nodes without copies.
+
+    Without a filepath the stack is kept in memory and handed over as a read-only
+    view, instead of the deep copy made by ``MemoryDataset``. With a filepath it is
+    persisted as a raw ``.npy`` file which is memory-mapped on load, so only the
+    events actually accessed are read from disk.
+
+    Example catalog entry::
+
+        noisy_images:
+          type: cygunet.datasets.CygnoImageStack
+          filepath: data/05_model_input/noisy_images.npy
+          load_args:
+            start: 0
+            stop: 1000
+    """
+
+    def __init__(
+        self,
+        filepath: Optional[str] = None,
+        mmap_mode: Optional[str] = "r",
+        load_args: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initializes the dataset.
+
+        Parameters:
+            filepath (str): Path of the ``.npy`` file. Keeps the stack in memory if None.
+            mmap_mode (str): ``numpy.load`` memory-map mode, None reads the whole file.
+            load_args (dict): Optional ``start`` and ``stop`` events to load.
+        """
+        self._filepath = Path(filepath) if filepath is not None else None
+        self._mmap_mode = mmap_mode
+        load_args = load_args or {}
+        self._start = load_args.get("start")
+        self._stop = load_args.get("stop")
+        self._data = None
+
+    def _load(self) -> NDArray:
+        """
+        Loads the stack, restricted to the configured ``[start:stop]`` events.
+
+        Returns:
+            NDArray: A read-only view or memory map of the stack.
+
+        Raises:
+            DatasetError: If an in-memory stack has not been saved, e.g. when its
+                producer ran in another process or pipeline.
+        """
+        if self._filepath is None:
+            if self._data is None:
+                raise DatasetError("Data for CygnoImageStack has not been saved yet.")
+            data = self._data
+        else:
+            data = np.load(self._filepath, mmap_mode=self._mmap_mode)
+        return _read_only(data[self._start : self._stop])
+
+    def _save(self, data: NDArray) -> None:
+        """
+        Saves the stack, in memory without copying or to a ``.npy`` file.
+
+        The file is written next to its destination and moved into place, so
+        memory maps of a previous version stay valid.
+
+        Parameters:
+            data (NDArray): Stack of shape ``(N, H, W)``.
+
+        Raises:
+            ValueError: If the stack is not three-dimensional.
+        """
+        if np.ndim(data) != 3:
+            raise ValueError(f"Expected an (N, H, W) stack, got shape {np.shape(data)}")
+        if self._filepath is None:
+            self._data = _read_only(np.asarray(data))
+            return
+        self._filepath.parent.mkdir(parents=True, exist_ok=True)
+        staging = self._filepath.with_name(f".{self._filepath.name}.{os.getpid()}")
+        with open(staging, "wb") as f:
+            np.save(f, data)
+        os.replace(staging, self._filepath)
+
+    def _exists(self) -> bool:
+        """
+        Checks if the stack has been saved.
+
+        Returns:
+            bool: True if the stack is in memory or its file exists, otherwise False.
+        """
+        if self._filepath is None:
+            return self._data is not None
+        return self._filepath.exists()
+
+    def _release(self) -> None:
+        """
+        Drops the in-memory stack.
+        """
+        self._data = None
+
+    def _describe(self) -> dict:
+        """
+        Provides a basic description of the dataset.
+
+        Returns:
+            dict: The file path, memory-map mode and loaded event range.
+        """
+        return dict(
+            filepath=self._filepath,
+            mmap_mode=self._mmap_mode,
+            start=self._start,
+            stop=self._stop,
+        )
@@ -0,0 +1,171 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+from kedro.io import AbstractDataset, DatasetError
+from numpy.typing import NDArray
+
+from .cygno_data import CygnoNoiseImage, CygnoSimulationImage
+from .rebin import rebin
+
+_SOURCES = {"simulation": CygnoSimulationImage, "noise": CygnoNoiseImage}
+
+
+class CygnoPyramid(AbstractDataset[Union[NDArray, Dict[int, NDArray]], None]):
+    """
+    A Kedro dataset serving block-summed, lower resolution copies of simulation or noise data.
+
+    On first load every event of the source file is rebinned by each factor and the
+    levels are cached as int32 ``.npy`` stacks, which are memory-mapped on later loads.
+    The cache is rebuilt when the source file changes.
+
+    Example catalog entry::
+
+        "simulation_{factor}x.{particle}_{energy}":
+          type: cygunet.datasets.CygnoPyramid
+          filepath: data/01_raw/LIME_no_noise_{particle}_{energy}_keV/histograms_Run00001.h5
+          source: simulation
+          cache_dir: data/04_feature/pyramids/LIME_no_noise_{particle}_{energy}_keV
+          factor: "{factor}"
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        source: str,
+        cache_dir: Optional[str] = None,
+        factors: Sequence[int] = (2, 4, 8),
+        factor: Optional[int] = None,
+        batch_size: int = 64,
+    ):
+        """
+        Initializes the dataset.
+
+        Parameters:
+            filepath (str): Path of the source HDF5 or ROOT file.
+            source (str): ``simulation`` or ``noise``, the type of the source file.
+            cache_dir (str): Directory of the cached levels, next to the source by default.
+            factors (Sequence[int]): Rebinning factors of the cached levels.
+            factor (int): Level returned by ``load``, all levels as a dict if None.
+            batch_size (int): Number of events rebinned at a time when building the cache.
+        """
+        if source not in _SOURCES:
+            raise ValueError(f"source must be one of {sorted(_SOURCES)}, got {source}")
+        self._filepath = Path(filepath)
+        self._source = source
+        self._cache_dir = (
+            Path(cache_dir)
+            if cache_dir is not None
+            else self._filepath.parent / ".pyramid"
+        )
+        # Factors may come as strings from dataset factory placeholders
+        factor = int(factor) if factor is not None else None
+        self._factors = sorted(
+            {int(f) for f in factors} | ({factor} if factor else set())
+        )
+        self._factor = factor
+        self._batch_size = batch_size
+
+    def _level_path(self, factor: int) -> Path:
+        return self._cache_dir / f"{self._filepath.stem}_{factor}x.npy"
+
+    def _fingerprint(self) -> dict:
+        stat = self._filepath.stat()
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "factors": self._factors,
+        }
+
+    def _is_cached(self) -> bool:
+        meta = self._cache_dir / f"{self._filepath.stem}.json"
+        return (
+            meta.exists()
+            and json.loads(meta.read_text()) == self._fingerprint()
+            and all(self._level_path(f).exists() for f in self._factors)
+        )
+
+    def build(self) -> None:
+        """
+        Rebins every event of the source file and writes the cached levels.
+
+        Noise frames are rounded to integer counts. Each level is computed
+        from the previous one when its factor is a multiple of it, which sums
+        far fewer pixels than starting again from full resolution.
+        """
+        events = _SOURCES[self._source](str(self._filepath)).load()
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        levels = {}
+        for start in range(0, len(events), self._batch_size):
+            stop = min(start + self._batch_size, len(events))
+            full = np.stack([events[i] for i in range(start, stop)])
+            if not np.issubdtype(full.dtype, np.integer):
+                full = np.rint(full).astype(np.int32)
+            previous, previous_factor = full, 1
+            for factor in self._factors:
+                if factor % previous_factor:
+                    previous, previous_factor = full, 1
+                level = rebin(previous, factor // previous_factor, np.int32)
+                if factor not in levels:
+                    levels[factor] = np.lib.format.open_memmap(
+                        self._staging(factor),
+                        mode="w+",
+                        dtype=np.int32,
+                        shape=(len(events), *level.shape[1:]),
+                    )
+                levels[factor][start:stop] = level
+                previous, previous_factor = level, factor
+
+        for factor, level in levels.items():
+            level.flush()
+            os.replace(self._staging(factor), self._level_path(factor))
+        meta = self._cache_dir / f"{self._filepath.stem}.json"
+        meta.write_text(json.dumps(self._fingerprint()))
+
+    def _staging(self, factor: int) -> Path:
+        return self._cache_dir / f".{self._level_path(factor).name}.{os.getpid()}"
+
+    def _load(self) -> Union[NDArray, Dict[int, NDArray]]:
+        """
+        Loads the cached levels, building them first if needed.
+
+        Returns:
+            NDArray or Dict[int, NDArray]: The memory-mapped ``(N, H / f, W / f)`` level
+            selected by ``factor``, or every level keyed by its factor.
+        """
+        if not self._is_cached():
+            self.build()
+        levels = {f: np.load(self._level_path(f), mmap_mode="r") for f in self._factors}
+        return levels[self._factor] if self._factor else levels
+
+    def _save(self, data) -> None:
+        """
+        Pyramids are derived from their source file and cannot be saved.
+        """
+        raise DatasetError("CygnoPyramid is read-only")
+
+    def _exists(self) -> bool:
+        """
+        Checks if the source file exists at the specified path.
+
+        Returns:
+            bool: True if the file exists, otherwise False.
+        """
+        return self._filepath.exists()
+
+    def _describe(self) -> dict:
+        """
+        Provides a basic description of the dataset.
+
+        Returns:
+            dict: The source file, its type, the cache directory and the factors.
+        """
+        return dict(
+            filepath=self._filepath,
+            source=self._source,
+            cache_dir=self._cache_dir,
+            factors=self._factors,
+            factor=self._factor,
+        )
@@ -0,0 +1,32 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+
+def rebin(image: NDArray, factor: int, dtype: Optional[DTypeLike] = None) -> NDArray:
+    """Sums ``factor x factor`` pixel blocks of an image or a stack of images.
+
+    The last two axes are rebinned, so both ``(H, W)`` images and ``(N, H, W)``
+    stacks are supported. Rows and columns beyond the last full block are
+    dropped. Integer images are accumulated in at least int32, so summing up to
+    ``256 x 256`` int16 pixels cannot overflow.
+
+    Args:
+        image: Image or stack of images.
+        factor: Side of the summed blocks.
+        dtype: Accumulation and output type, defaults to the input type
+            promoted to at least int32.
+    Returns:
+        The rebinned image(s), with the last two axes divided by ``factor``.
+    """
+    image = np.asarray(image)
+    if factor < 1:
+        raise ValueError(f"Rebinning factor must be positive, got {factor}")
+    if dtype is None:
+        dtype = np.result_type(image.dtype, np.int32)
+    height, width = image.shape[-2] // factor, image.shape[-1] // factor
+    blocks = image[..., : height * factor, : width * factor].reshape(
+        *image.shape[:-2], height, factor, width, factor
+    )
+    return blocks.sum(axis=(-3, -1), dtype=dtype)
@@ -1,24 +1,267 @@
-# from kedro.framework.hooks import hook_impl
-# from pyspark import SparkConf
-# from pyspark.sql import SparkSession
-
-
-# class SparkHooks:
-#     @hook_impl
-#     def after_context_created(self, context) -> None:
-#         """Initialises a SparkSession using the config
-#         defined in project's conf folder.
-#         """
-
-#         # Load the spark configuration in spark.yaml using the config loader
-#         parameters = context.config_loader["spark"]
-#         spark_conf = SparkConf().setAll(parameters.items())
-
-#         # Initialise the spark session
-#         spark_session_conf = (
-#             SparkSession.builder.appName(context.project_path.name)
-#             .enableHiveSupport()
-#             .config(conf=spark_conf)
-#         )
-#         _spark_session = spark_session_conf.getOrCreate()
-#         _spark_session.sparkContext.setLogLevel("WARN")
+import cProfile
+import json
+import logging
+import os
+import re
+import resource
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from kedro.framework.hooks import hook_impl
+
+logger = logging.getLogger(__name__)
+
+
+class SparkHooks:
+    """Initialises a SparkSession using the config defined in project's conf folder.
+
+    Only nodes tagged ``spark`` need a session, so it is created right before
+    the first of them runs. Other pipelines, e.g. inference or reporting, never
+    import pyspark nor start a JVM.
+    """
+
+    def __init__(self):
+        self._app_name: Optional[str] = None
+        self._spark_conf: Dict[str, Any] = {}
+
+    @hook_impl
+    def after_context_created(self, context) -> None:
+        # Load the spark configuration in spark.yaml using the config loader
+        self._app_name = context.project_path.name
+        self._spark_conf = dict(context.config_loader["spark"])
+
+    @hook_impl
+    def before_node_run(self, node) -> None:
+        if "spark" not in node.tags:
+            return
+        from pyspark import SparkConf
+        from pyspark.sql import SparkSession
+
+        spark_conf = SparkConf().setAll(self._spark_conf.items())
+
+        # Initialise the spark session
+        spark_session_conf = SparkSession.builder.config(conf=spark_conf)
+        if self._app_name:
+            spark_session_conf = spark_session_conf.appName(self._app_name)
+        _spark_session = spark_session_conf.getOrCreate()
+        _spark_session.sparkContext.setLogLevel("WARN")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process in MB."""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 2**20 if sys.platform == "darwin" else 2**10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _sizeof(data: Any) -> int:
+    """Estimates the in-memory size in bytes of a loaded or saved object."""
+    if hasattr(data, "nbytes"):
+        return int(data.nbytes)
+    if hasattr(data, "memory_usage"):
+        return int(data.memory_usage(index=True, deep=True).sum())
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    if isinstance(data, dict):
+        return sys.getsizeof(data) + sum(_sizeof(v) for v in data.values())
+    if isinstance(data, (list, tuple)):
+        return sys.getsizeof(data) + sum(_sizeof(v) for v in data)
+    return sys.getsizeof(data)
+
+
+def _runner_name(runner: Any) -> Optional[str]:
+    """Class name of the runner, which Kedro passes as the repr of the instance."""
+    if runner is None:
+        return None
+    if not isinstance(runner, str):
+        return getattr(runner, "__name__", type(runner).__name__)
+    match = re.search(r"(\w+) object at 0x", runner)
+    return match.group(1) if match else runner
+
+
+class _Timer:
+    def __init__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.rss = peak_rss_mb()
+
+    def stop(self) -> Dict[str, float]:
+        return {
+            "wall_time_s": time.perf_counter() - self.wall,
+            "cpu_time_s": time.process_time() - self.cpu,
+            "peak_rss_delta_mb": peak_rss_mb() - self.rss,
+        }
+
+
+class PerformanceHooks:
+    """Records per-node and per-dataset timings and writes one JSON report per run.
+
+    Every node gets its wall time, process CPU time, growth of the peak RSS and
+    the size of its outputs. Every dataset gets the same timings and the size of
+    the data for each load and save, plus the size of its file when it has one,
+    as lazy wrappers such as the HDF5 and ROOT ones barely weigh anything in
+    memory. CPU time and RSS are process-wide, so they are only attributable to
+    a single node with the ``SequentialRunner``.
+
+    With the ``ParallelRunner`` node and dataset hooks run in the worker
+    processes, so the report written by the main process only holds the run
+    totals. Such runs are flagged in the report and logged.
+
+    Args:
+        output_dir: Directory the reports are written to, relative to the project.
+        profile_nodes: Names of nodes to run under ``cProfile``. Their stats are
+            dumped next to the report and can be read with ``pstats``.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "data/09_tracking/performance",
+        profile_nodes: Iterable[str] = (),
+    ):
+        self._output_dir = Path(output_dir)
+        self._profile_nodes = set(profile_nodes)
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._run_timer: Optional[_Timer] = None
+        self._timers: Dict[Any, _Timer] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._datasets: Dict[str, Dict[str, list]] = {}
+
+    @hook_impl
+    def after_context_created(self, context) -> None:
+        if not self._output_dir.is_absolute():
+            self._output_dir = context.project_path / self._output_dir
+
+    @hook_impl
+    def after_catalog_created(self, catalog) -> None:
+        self._catalog = catalog
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        self._reset()
+        self._run_timer = _Timer()
+        if _runner_name(run_params.get("runner")) == "ParallelRunner":
+            logger.warning(
+                "Node and dataset timings are not recorded with the ParallelRunner, "
+                "its hooks run in the worker processes"
+            )
+
+    @hook_impl
+    def before_node_run(self, node) -> None:
+        with self._lock:
+            self._timers[node.name] = _Timer()
+        if node.name in self._profile_nodes:
+            profile = cProfile.Profile()
+            self._profiles[node.name] = profile
+            profile.enable()
+
+    @hook_impl
+    def after_node_run(self, node, outputs: Dict[str, Any]) -> None:
+        profile = self._profiles.get(node.name)
+        if profile is not None:
+            profile.disable()
+        with self._lock:
+            record = self._timers.pop(node.name).stop()
+            record["status"] = "success"
+            record["output_bytes"] = sum(_sizeof(v) for v in outputs.values())
+            self._nodes[node.name] = record
+
+    @hook_impl
+    def on_node_error(self, error: Exception, node) -> None:
+        profile = self._profiles.get(node.name)
+        if profile is not None:
+            profile.disable()
+        with self._lock:
+            timer = self._timers.pop(node.name, None)
+            record = timer.stop() if timer is not None else {}
+            record["status"] = "error"
+            record["error"] = repr(error)
+            self._nodes[node.name] = record
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str, node) -> None:
+        with self._lock:
+            self._timers["load", dataset_name, node.name] = _Timer()
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str, data: Any, node) -> None:
+        self._record_dataset("load", dataset_name, data, node)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, node) -> None:
+        with self._lock:
+            self._timers["save", dataset_name, node.name] = _Timer()
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any, node) -> None:
+        self._record_dataset("save", dataset_name, data, node)
+
+    def _file_bytes(self, dataset_name: str) -> Optional[int]:
+        """Size of the file of a catalog dataset, if it has a local one."""
+        try:
+            dataset = self._catalog._get_dataset(dataset_name)
+        except Exception:
+            return None
+        filepath = getattr(dataset, "_filepath", None)
+        if filepath is None or not os.path.isfile(filepath):
+            return None
+        return os.path.getsize(filepath)
+
+    def _record_dataset(
+        self, operation: str, dataset_name: str, data: Any, node
+    ) -> None:
+        file_bytes = (
+            self._file_bytes(dataset_name) if self._catalog is not None else None
+        )
+        with self._lock:
+            record = self._timers.pop((operation, dataset_name, node.name)).stop()
+            record["node"] = node.name
+            record["bytes"] = _sizeof(data)
+            if file_bytes is not None:
+                record["file_bytes"] = file_bytes
+            dataset = self._datasets.setdefault(dataset_name, {"load": [], "save": []})
+            dataset[operation].append(record)
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        self._write_report(run_params, status="success")
+
+    @hook_impl
+    def on_pipeline_error(self, error: Exception, run_params: Dict[str, Any]) -> None:
+        self._write_report(run_params, status="error")
+
+    def _write_report(self, run_params: Dict[str, Any], status: str) -> Path:
+        run_id = run_params.get("session_id") or datetime.now(timezone.utc).strftime(
+            "%Y-%m-%dT%H.%M.%S.%fZ"
+        )
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+
+        profiles = {}
+        for name, profile in self._profiles.items():
+            profiles[name] = str(self._output_dir / f"{run_id}_{name}.prof")
+            profile.dump_stats(profiles[name])
+
+        report = {
+            "run_id": run_id,
+            "status": status,
+            "pipeline_name": run_params.get("pipeline_name"),
+            "runner": _runner_name(run_params.get("runner")),
+            "nodes_recorded": _runner_name(run_params.get("runner"))
+            != "ParallelRunner",
+            "run": self._run_timer.stop() if self._run_timer else {},
+            "nodes": self._nodes,
+            "datasets": self._datasets,
+            "profiles": profiles,
+        }
+        filepath = self._output_dir / f"{run_id}.json"
+        with open(filepath, "w") as f:
+            json.dump(report, f, indent=2)
+        return filepath
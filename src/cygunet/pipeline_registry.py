@@ -1,16 +1,22 @@
-# """Project pipelines."""
-# from typing import Dict
+"""Project pipelines."""
+from typing import Dict
 
-# from kedro.framework.project import find_pipelines
-# from kedro.pipeline import Pipeline
+from kedro.framework.project import find_pipelines
+from kedro.pipeline import Pipeline
 
+from cygunet.pipelines.data_processing.pipeline import create_spark_pipeline
 
-# def register_pipelines() -> Dict[str, Pipeline]:
-#     """Register the project's pipelines.
 
-#     Returns:
-#         A mapping from pipeline names to ``Pipeline`` objects.
-#     """
-#     pipelines = find_pipelines()
-#     pipelines["__default__"] = sum(pipelines.values())
-#     return pipelines
+def register_pipelines() -> Dict[str, Pipeline]:
+    """Register the project's pipelines.
+
+    The Spark generation produces the same pairs as the local one, so it is
+    registered separately and left out of the default pipeline.
+
+    Returns:
+        A mapping from pipeline names to ``Pipeline`` objects.
+    """
+    pipelines = find_pipelines()
+    pipelines["__default__"] = sum(pipelines.values())
+    pipelines["data_processing_spark"] = create_spark_pipeline()
+    return pipelines
@@ -1,3 +1,3 @@
-"""Complete Data Processing pipeline for the spaceflights tutorial"""
+"""Data processing pipeline generating the denoising training pairs"""
 
 from .pipeline import create_pipeline  # NOQA
@@ -0,0 +1,169 @@
+"""Content-addressed cache of generated training datasets.
+
+Entries are keyed by a hash of everything the generated pairs depend on: the
+fingerprints of the input files, the generation parameters, the seed and the
+version of the generation code. Every entry is a directory of ``.npy`` files
+which are served memory-mapped, and the cache is kept under a size limit by
+evicting the least recently used entries.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+import cygunet
+
+logger = logging.getLogger(__name__)
+
+# Packages whose source changes invalidate the cached outputs: the generation
+# code itself and the datasets it reads the raw files with.
+_GENERATION_PACKAGES = (Path(__file__).parent, Path(__file__).parents[2] / "datasets")
+
+
+def fingerprint_file(filepath: str) -> Dict:
+    """Fingerprints a file by its resolved path, size and modification time.
+
+    Hashing the content of multi-GB raw files would cost as much as reading
+    them, so a file is considered changed whenever it is rewritten.
+    """
+    stat = os.stat(filepath)
+    return {
+        "path": str(Path(filepath).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def code_version() -> str:
+    """Hashes the package version and every module of the generation code."""
+    digest = hashlib.sha256(cygunet.__version__.encode())
+    for package in _GENERATION_PACKAGES:
+        for path in sorted(package.glob("*.py")):
+            digest.update(f"{package.name}/{path.name}".encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def cache_key(input_files: Iterable[str], parameters: Mapping) -> str:
+    """Computes the cache key of a generation run.
+
+    Args:
+        input_files: Simulation and noise files the pairs are drawn from.
+        parameters: Generation parameters, including the seed.
+    Returns:
+        Hex digest identifying the generated output.
+    """
+    content = {
+        "inputs": [fingerprint_file(f) for f in sorted(input_files)],
+        "parameters": dict(parameters),
+        "code_version": code_version(),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class GenerationCache:
+    """Directory of cached generation outputs with LRU eviction.
+
+    Args:
+        directory: Directory holding one subdirectory per cache entry.
+        max_bytes: Size limit of the whole cache. Least recently used entries
+            are evicted after every insertion until the cache fits.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+
+    def path(self, key: str) -> Path:
+        """Directory of the entry stored under ``key``."""
+        return self._directory / key
+
+    def get(self, key: str) -> Optional[List[NDArray]]:
+        """Returns the memory-mapped arrays stored under ``key``, if any."""
+        entry = self._directory / key
+        if not entry.is_dir():
+            return None
+        os.utime(entry)
+        return [np.load(f, mmap_mode="r") for f in sorted(entry.glob("*.npy"))]
+
+    def staging(self, key: str) -> Path:
+        """Directory an entry is written to before being committed."""
+        return self._directory / f".{key}.{os.getpid()}"
+
+    def stage(
+        self, key: str, specs: Sequence[Tuple[Tuple[int, ...], DTypeLike]]
+    ) -> List[np.memmap]:
+        """Preallocates the arrays of an entry as writable memory-mapped files.
+
+        Args:
+            key: Key of the entry.
+            specs: Shape and dtype of every array.
+        Returns:
+            The arrays to fill in place, stored once ``commit`` is called.
+        """
+        staging = self.staging(key)
+        staging.mkdir(parents=True, exist_ok=True)
+        return [
+            np.lib.format.open_memmap(
+                staging / f"{i:03d}.npy", mode="w+", dtype=dtype, shape=tuple(shape)
+            )
+            for i, (shape, dtype) in enumerate(specs)
+        ]
+
+    def commit(self, key: str) -> List[NDArray]:
+        """Stores the staged entry under ``key`` and returns its arrays memory-mapped."""
+        entry = self._directory / key
+        staging = self.staging(key)
+        if entry.exists():
+            shutil.rmtree(staging)
+        else:
+            staging.rename(entry)
+        self.evict(keep=key)
+        return self.get(key)
+
+    def discard(self, key: str) -> None:
+        """Removes a staged entry which is not going to be committed."""
+        shutil.rmtree(self.staging(key), ignore_errors=True)
+
+    def put(self, key: str, arrays: List[NDArray]) -> List[NDArray]:
+        """Stores ``arrays`` under ``key`` and returns them memory-mapped."""
+        staged = self.stage(key, [(array.shape, array.dtype) for array in arrays])
+        for target, array in zip(staged, arrays):
+            target[...] = array
+            target.flush()
+        del staged
+        return self.commit(key)
+
+    def _entries(self) -> List[Path]:
+        if not self._directory.is_dir():
+            return []
+        return [
+            p
+            for p in self._directory.iterdir()
+            if p.is_dir() and not p.name.startswith(".")
+        ]
+
+    @staticmethod
+    def _size(entry: Path) -> int:
+        return sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Removes least recently used entries until the cache fits its limit."""
+        if self._max_bytes is None:
+            return
+        entries = sorted(self._entries(), key=lambda p: p.stat().st_mtime_ns)
+        total = sum(self._size(e) for e in entries)
+        for entry in entries:
+            if total <= self._max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            total -= self._size(entry)
+            shutil.rmtree(entry)
+            logger.info("Evicted generation cache entry %s", entry.name)
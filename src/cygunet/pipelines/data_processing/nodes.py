@@ -1,14 +1,247 @@
+import logging
+import random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
 import numpy as np
+from numpy.typing import NDArray
+
+from cygunet.datasets.bulk import load_files
+from cygunet.datasets.cygno_data import (
+    CygnoNoiseImage,
+    CygnoSimulationImage,
+    HDF5GroupWrapper,
+    LazyROOTData,
+)
+
+from .cache import GenerationCache, cache_key
+from .records import SampleRecords
+from .sampler import StratifiedSampler, stratum_name
+from .utils import augment_pair, draw_augmentation, expand_files
+from .validation import drawable_events
+
+logger = logging.getLogger(__name__)
+
+# Generation parameters the generated pairs depend on.
+CACHED_PARAMETERS = (
+    "range_mask",
+    "range_noise",
+    "max_translation",
+    "cut_edges",
+    "max_events",
+    "seed",
+    "sampling",
+)
+
+
+def _draw(events: NDArray[np.int64]) -> int:
+    return int(events[np.random.randint(len(events))])
+
+
+def _uniform_events(
+    mask_datasets: List[HDF5GroupWrapper],
+    mask_events: List[NDArray[np.int64]],
+    max_events: int,
+):
+    for _ in range(max_events):
+        mask_file = random.randrange(len(mask_datasets))
+        index = _draw(mask_events[mask_file])
+        yield mask_file, index, mask_datasets[mask_file][index]
+
+
 def generate_data(
-    mask_datasets, 
-    bg_dataset, 
-    range_mask, 
-    range_noise, 
-    max_translation, 
-    cut_egdes, 
-    max_events):
-
-    events = np.random.randint(max_events)
-    for ev in events:
-        index = np.random.randint(*range_mask)
-        ds = random.choice(mask_datasets)
\ No newline at end of file
+    mask_datasets: List[HDF5GroupWrapper],
+    bg_datasets: List[LazyROOTData],
+    range_mask: Sequence[int],
+    range_noise: Sequence[int],
+    max_translation: int,
+    cut_egdes: Sequence[int],
+    max_events: int,
+    sampler: Optional[StratifiedSampler] = None,
+    batch_size: int = 32,
+    records: Optional[SampleRecords] = None,
+    allocate: Optional[Callable[[Tuple[int, ...]], Sequence[NDArray]]] = None,
+    bad_mask_events: Optional[Sequence[Sequence[int]]] = None,
+    bad_noise_events: Optional[Sequence[Sequence[int]]] = None,
+) -> Tuple[NDArray[np.int16], NDArray[np.int16]]:
+    """Generates noisy/clean training pairs from simulation and noise images.
+
+    Args:
+        mask_datasets: Simulation files the clean tracks are drawn from.
+        bg_datasets: Noise runs the backgrounds are drawn from.
+        range_mask: ``[low, high)`` event indices drawn from the simulations,
+            capped at the number of events of each file.
+        range_noise: ``[low, high)`` event indices drawn from the noise runs,
+            capped at the number of events of each file.
+        max_translation: Maximum translation in pixels of the clean tracks.
+        cut_egdes: ``(xmin, xmax, ymin, ymax)`` window kept from every image.
+        max_events: Number of pairs to generate.
+        sampler: Draws the clean tracks stratified by particle and energy
+            instead of uniformly from ``mask_datasets``.
+        batch_size: Number of clean tracks read at a time by the sampler, all
+            of which are held in memory until the batch is consumed.
+        records: Table the provenance of every pair is appended to, its files
+            in the order of ``mask_datasets`` and ``bg_datasets``.
+        allocate: Called with the ``(N, H, W)`` shape of the stacks once the
+            first pair is built, returns the noisy and clean int16 arrays the
+            pairs are written to, e.g. memory-mapped files. Defaults to
+            in-memory arrays.
+        bad_mask_events: Indices of the events never drawn from every file of
+            ``mask_datasets``, in the same order. Unused with a sampler,
+            which is given them when built.
+        bad_noise_events: Indices of the events never drawn from every file
+            of ``bg_datasets``, in the same order.
+    Returns:
+        Stacks of noisy inputs and clean targets, each ``(N, H, W)``.
+    Raises:
+        ValueError: If ``max_events`` is not positive, as the shape of the
+            stacks is only known from the first pair.
+    """
+    if max_events < 1:
+        raise ValueError(f"max_events must be at least 1, got {max_events}")
+    noise_events = drawable_events(bg_datasets, range_noise, bad_noise_events)
+    if sampler is None:
+        mask_events = drawable_events(mask_datasets, range_mask, bad_mask_events)
+        events = _uniform_events(mask_datasets, mask_events, max_events)
+    else:
+        # The sampler yields the wrappers it was built from
+        position = {id(ds): i for i, ds in enumerate(mask_datasets)}
+        events = (
+            (position[id(ds)], index, image)
+            for ds, index, image in sampler.events(max_events, batch_size)
+        )
+
+    noisy = clean = None
+    for i, (mask_file, mask_index, mask) in enumerate(events):
+        noise_file = random.randrange(len(bg_datasets))
+        noise_index = _draw(noise_events[noise_file])
+        augmentation = draw_augmentation(max_translation)
+        x, y = augment_pair(
+            mask, bg_datasets[noise_file][noise_index], *augmentation, cut_egdes
+        )
+        if records is not None:
+            records.append(
+                mask_file, mask_index, noise_file, noise_index, *augmentation
+            )
+        if noisy is None:
+            shape = (max_events, *x.shape)
+            if allocate is None:
+                noisy, clean = np.empty(shape, np.int16), np.empty(shape, np.int16)
+            else:
+                noisy, clean = allocate(shape)
+        noisy[i] = x
+        clean[i] = y
+    return noisy, clean
+
+
+def generate_data_cached(
+    parameters: Dict,
+    cache_options: Dict,
+    bad_events: Optional[Dict[str, List[int]]] = None,
+) -> Tuple[NDArray[np.int16], NDArray[np.int16], SampleRecords]:
+    """Generates training pairs, reusing a previous output when nothing changed.
+
+    The cache key covers the fingerprints of the matched simulation and noise
+    files, the generation parameters including the seed, and the version of
+    the generation code. On a hit nothing is generated and the stored pairs
+    are returned memory-mapped. On a miss the pairs are written one at a time
+    into preallocated memory-mapped files of the new entry, so memory use does
+    not grow with the number of pairs. The provenance records of the pairs are
+    stored in the ``records`` directory of the cache entry.
+
+    Args:
+        parameters: Generation parameters defined in parameters_data_processing.yml.
+        cache_options: Cache ``directory`` and ``max_size_gb`` limit.
+        bad_events: Indices of the events of every file to skip, as found by
+            ``validate_inputs``.
+    Returns:
+        Read-only stacks of noisy inputs and clean targets, each ``(N, H, W)``,
+        and the provenance record of every pair.
+    Raises:
+        ValueError: If ``max_events`` is not positive.
+    """
+    if parameters["max_events"] < 1:
+        raise ValueError(
+            f"max_events must be at least 1, got {parameters['max_events']}"
+        )
+    simulation_files = expand_files(parameters["simulation_files"])
+    noise_files = expand_files(parameters["noise_files"])
+    max_size_gb = cache_options.get("max_size_gb")
+    cache = GenerationCache(
+        cache_options["directory"],
+        None if max_size_gb is None else int(max_size_gb * 2**30),
+    )
+    bad_events = bad_events or {}
+    key = cache_key(
+        simulation_files + noise_files,
+        {
+            **{name: parameters.get(name) for name in CACHED_PARAMETERS},
+            "bad_events": {
+                f: bad_events[f]
+                for f in simulation_files + noise_files
+                if f in bad_events
+            },
+        },
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("Serving training pairs from generation cache entry %s", key)
+        noisy, clean = cached
+        return noisy, clean, SampleRecords.load(cache.path(key) / "records")
+
+    random.seed(parameters["seed"])
+    np.random.seed(parameters["seed"])
+    concurrency = parameters.get("load_concurrency", 16)
+    simulations = load_files(CygnoSimulationImage, simulation_files, concurrency)
+    noises = load_files(CygnoNoiseImage, noise_files, concurrency)
+    bad_simulation_events = [bad_events.get(f, []) for f in simulation_files]
+    sampling = parameters.get("sampling")
+    sampler = None
+    if sampling is not None:
+        strata: Dict[str, List[HDF5GroupWrapper]] = {}
+        bad_strata_events: Dict[str, List[List[int]]] = {}
+        for f, ds, bad in zip(simulation_files, simulations, bad_simulation_events):
+            strata.setdefault(stratum_name(f), []).append(ds)
+            bad_strata_events.setdefault(stratum_name(f), []).append(bad)
+        sampler = StratifiedSampler(
+            strata,
+            parameters["range_mask"],
+            sampling.get("particle_weights"),
+            sampling.get("energy_weights"),
+            seed=parameters["seed"],
+            bad_events=bad_strata_events,
+        )
+    records = SampleRecords(
+        {f: ds.keys for f, ds in zip(simulation_files, simulations)},
+        {f: ds.keys for f, ds in zip(noise_files, noises)},
+        parameters["cut_edges"],
+        capacity=parameters["max_events"],
+    )
+    try:
+        noisy, clean = generate_data(
+            simulations,
+            noises,
+            parameters["range_mask"],
+            parameters["range_noise"],
+            parameters["max_translation"],
+            parameters["cut_edges"],
+            parameters["max_events"],
+            sampler=sampler,
+            batch_size=(sampling or {}).get("batch_size", 32),
+            records=records,
+            # Pairs are written straight to the cache entry, one at a time
+            allocate=lambda shape: cache.stage(
+                key, [(shape, np.int16), (shape, np.int16)]
+            ),
+            bad_mask_events=bad_simulation_events,
+            bad_noise_events=[bad_events.get(f, []) for f in noise_files],
+        )
+        noisy.flush()
+        clean.flush()
+        del noisy, clean
+        records.save(cache.staging(key) / "records")
+    except BaseException:
+        cache.discard(key)
+        raise
+    noisy, clean = cache.commit(key)
+    return noisy, clean, records
@@ -0,0 +1,212 @@
+"""Bounded-memory bank of representative noise frames across camera runs.
+
+Every camera keeps a fixed number of frames in a preallocated array. The bank
+is stratified by run: the slots are shared equally between the runs, runs
+shorter than their share keep all their frames and the slots they leave are
+shared between the others. Each run holds a uniform random sample of its
+frames. When a new run arrives the existing runs give up slots at random,
+which keeps each of them a uniform sample, so new runs are added without
+rescanning the old ones.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from cygunet.datasets import CygnoNoiseImage
+
+from .utils import INT16_MAX, INT16_MIN, expand_files
+
+logger = logging.getLogger(__name__)
+
+
+class NoiseBank:
+    """Fixed-size, run-stratified sample of the noise frames of one camera.
+
+    Args:
+        capacity: Maximum number of frames kept.
+        seed: Seed of the random generator choosing the frames.
+    """
+
+    def __init__(self, capacity: int, seed: Optional[int] = None):
+        self.capacity = capacity
+        self._rng = np.random.default_rng(seed)
+        self._frames: Optional[NDArray[np.int16]] = None
+        # Run index and source frame index of every slot, -1 for free slots.
+        self._owner = np.full(capacity, -1, dtype=np.int32)
+        self._source = np.full(capacity, -1, dtype=np.int32)
+        self.runs: List[str] = []
+        # Number of frames of every run
+        self._sizes: List[int] = []
+
+    def __len__(self) -> int:
+        return int((self._owner >= 0).sum())
+
+    def _allocate(self, shape) -> None:
+        if self._frames is None:
+            self._frames = np.zeros((self.capacity, *shape), dtype=np.int16)
+        elif self._frames.shape[1:] != tuple(shape):
+            raise ValueError(
+                f"Frame shape {shape} does not match {self._frames.shape[1:]}"
+            )
+
+    def _held(self) -> NDArray[np.int64]:
+        return np.bincount(self._owner[self._owner >= 0], minlength=len(self.runs))
+
+    def _quotas(
+        self, sizes: NDArray[np.int64], held: NDArray[np.int64]
+    ) -> NDArray[np.int64]:
+        """Shares the slots equally between runs, short runs giving up what they cannot fill.
+
+        The slots left over by the integer division go one each to runs with
+        frames to spare, preferring runs already holding them, then at random.
+        """
+        quotas = np.zeros(len(sizes), dtype=np.int64)
+        remaining = self.capacity
+        while True:
+            open_runs = np.flatnonzero(quotas < sizes)
+            share = remaining // len(open_runs) if len(open_runs) else 0
+            if not share:
+                break
+            grants = np.minimum(share, sizes[open_runs] - quotas[open_runs])
+            quotas[open_runs] += grants
+            remaining -= int(grants.sum())
+        if remaining and len(open_runs):
+            holding = held[open_runs] > quotas[open_runs]
+            order = open_runs[np.lexsort((self._rng.random(len(open_runs)), ~holding))]
+            quotas[order[:remaining]] += 1
+        return quotas
+
+    def _shrink(self, quotas: NDArray[np.int64]) -> None:
+        """Frees random slots of every run holding more than its quota."""
+        for run, quota in enumerate(quotas):
+            slots = np.flatnonzero(self._owner == run)
+            if len(slots) > quota:
+                freed = self._rng.choice(slots, size=len(slots) - quota, replace=False)
+                self._owner[freed] = -1
+                self._source[freed] = -1
+
+    def add_run(self, name: str, frames) -> int:
+        """Adds a run, reading only the frames it keeps.
+
+        Args:
+            name: Name of the run, runs already in the bank are skipped.
+            frames: Sequence of ``(H, W)`` frames supporting ``len`` and
+                integer indexing, e.g. a loaded ``CygnoNoiseImage``.
+        Returns:
+            The number of frames kept from the run.
+        Raises:
+            ValueError: If the bank already holds ``capacity`` runs, as every
+                run keeps at least one frame.
+        """
+        if name in self.runs:
+            return 0
+        if len(self.runs) >= self.capacity:
+            raise ValueError(
+                f"Cannot add run {name}, the bank holds {self.capacity} frames "
+                f"and already has {len(self.runs)} runs"
+            )
+        n_frames = len(frames)
+        held = self._held()
+        quotas = self._quotas(np.array(self._sizes + [n_frames]), np.append(held, 0))
+        # Existing runs only give up frames, their unused slots go to the new run
+        quotas[:-1] = np.minimum(quotas[:-1], held)
+        quota = min(n_frames, self.capacity - int(quotas[:-1].sum()))
+        self._shrink(quotas[:-1])
+        self.runs.append(name)
+        self._sizes.append(n_frames)
+
+        kept = np.sort(self._rng.choice(n_frames, size=quota, replace=False))
+        slots = np.flatnonzero(self._owner < 0)[: len(kept)]
+        for slot, index in zip(slots, kept):
+            frame = np.asarray(frames[int(index)])
+            self._allocate(frame.shape)
+            self._frames[slot] = np.clip(frame, INT16_MIN, INT16_MAX)
+        self._owner[slots] = len(self.runs) - 1
+        self._source[slots] = kept
+        return len(kept)
+
+    def save(self, directory: str) -> None:
+        """Saves the kept frames as a compact, memory-mappable ``frames.npy``.
+
+        ``index.json`` records the run and source frame of every saved frame.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        slots = np.flatnonzero(self._owner >= 0)
+        frames = (
+            self._frames[slots]
+            if self._frames is not None
+            else np.zeros((0, 0, 0), np.int16)
+        )
+        np.save(directory / "frames.npy", frames)
+        index = {
+            "capacity": self.capacity,
+            "runs": self.runs,
+            "sizes": self._sizes,
+            "run": self._owner[slots].tolist(),
+            "frame": self._source[slots].tolist(),
+        }
+        (directory / "index.json").write_text(json.dumps(index))
+
+    @classmethod
+    def load(cls, directory: str, seed: Optional[int] = None) -> "NoiseBank":
+        """Loads a saved bank so that new runs can be added to it."""
+        directory = Path(directory)
+        index = json.loads((directory / "index.json").read_text())
+        bank = cls(index["capacity"], seed)
+        bank.runs = index["runs"]
+        bank._sizes = index["sizes"]
+        frames = np.load(directory / "frames.npy", mmap_mode="r")
+        n = len(index["run"])
+        if n:
+            bank._allocate(frames.shape[1:])
+            bank._frames[:n] = frames
+        bank._owner[:n] = index["run"]
+        bank._source[:n] = index["frame"]
+        return bank
+
+
+def _camera_and_run(filepath: str):
+    path = Path(filepath)
+    return path.parent.name, path.stem.replace("histograms_Run", "")
+
+
+def build_noise_bank(parameters: Dict) -> Dict[str, Dict[str, int]]:
+    """Builds or updates the noise bank of every camera.
+
+    Runs matching ``noise_files`` are grouped by camera, i.e. the directory of
+    the ``noise.{camera}_{runid}`` files. An existing bank in ``directory`` is
+    updated with the runs it does not hold yet.
+
+    Args:
+        parameters: Parameters defined in parameters_data_processing.yml.
+    Returns:
+        Number of runs and frames in the bank of every camera.
+    """
+    root = Path(parameters["directory"])
+    banks: Dict[str, NoiseBank] = {}
+    for filepath in expand_files(parameters["noise_files"]):
+        camera, run = _camera_and_run(filepath)
+        if camera not in banks:
+            if (root / camera / "index.json").exists():
+                banks[camera] = NoiseBank.load(root / camera, parameters.get("seed"))
+            else:
+                banks[camera] = NoiseBank(
+                    parameters["capacity"], parameters.get("seed")
+                )
+        if run not in banks[camera].runs:
+            kept = banks[camera].add_run(run, CygnoNoiseImage(filepath).load())
+            logger.info(
+                "Added %d frames of run %s to the %s noise bank", kept, run, camera
+            )
+
+    for camera, bank in banks.items():
+        bank.save(root / camera)
+    return {
+        camera: {"runs": len(bank.runs), "frames": len(bank)}
+        for camera, bank in banks.items()
+    }
@@ -1,46 +1,54 @@
 from kedro.pipeline import Pipeline, node, pipeline
 
-from .nodes import (
-    create_model_input_table,
-    load_shuttles_to_csv,
-    preprocess_companies,
-    preprocess_reviews,
-    preprocess_shuttles,
-)
+from .noise_bank import build_noise_bank
+from .nodes import generate_data_cached
+from .spark import generate_data_spark
+from .validation import validate_inputs
+
+
+def _validate_inputs_node():
+    return node(
+        func=validate_inputs,
+        inputs=["params:generation", "params:validation"],
+        outputs=["input_validation_report", "bad_events"],
+        name="validate_inputs_node",
+    )
 
 
 def create_pipeline(**kwargs) -> Pipeline:
+    """Generates the training pairs locally and builds the noise bank."""
     return pipeline(
         [
+            _validate_inputs_node(),
             node(
-                func=load_shuttles_to_csv,
-                inputs="shuttles_excel",
-                outputs="shuttles@csv",
-                name="load_shuttles_to_csv_node",
-            ),
-            node(
-                func=preprocess_companies,
-                inputs="companies",
-                outputs=["preprocessed_companies", "companies_columns"],
-                name="preprocess_companies_node",
-            ),
-            node(
-                func=preprocess_shuttles,
-                inputs="shuttles@spark",
-                outputs="preprocessed_shuttles",
-                name="preprocess_shuttles_node",
+                func=generate_data_cached,
+                inputs=["params:generation", "params:generation_cache", "bad_events"],
+                outputs=["noisy_images", "clean_images", "sample_records"],
+                name="generate_data_node",
+                tags="local",
             ),
             node(
-                func=preprocess_reviews,
-                inputs="reviews",
-                outputs="preprocessed_reviews",
-                name="preprocess_reviews_node",
+                func=build_noise_bank,
+                inputs="params:noise_bank",
+                outputs="noise_bank_summary",
+                name="build_noise_bank_node",
             ),
+        ]
+    )
+
+
+def create_spark_pipeline(**kwargs) -> Pipeline:
+    """Generates the training pairs on Spark, registered as data_processing_spark."""
+    return pipeline(
+        [
+            _validate_inputs_node(),
             node(
-                func=create_model_input_table,
-                inputs=["preprocessed_shuttles", "preprocessed_companies", "preprocessed_reviews"],
-                outputs="model_input_table@spark",
-                name="create_model_input_table_node",
+                func=generate_data_spark,
+                inputs=["params:generation", "bad_events"],
+                outputs="training_pairs@spark",
+                name="generate_data_spark_node",
+                # Starts the SparkSession, see SparkHooks
+                tags="spark",
             ),
         ]
     )
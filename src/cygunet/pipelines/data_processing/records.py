@@ -0,0 +1,189 @@
+"""Compact provenance records of generated training pairs.
+
+Every generated pair is described by one fixed-size record of a structured
+array: the simulation and noise events it was built from, as positions in
+per-file key tables, and the translation and rotation applied to the track.
+Strings are kept once per file rather than once per sample, so a record costs
+17 bytes and millions of samples can be queried in memory without touching
+the images. Any sample can be rebuilt exactly from its record.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from cygunet.datasets import CygnoNoiseImage, CygnoSimulationImage
+
+from .utils import augment_pair
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("simulation_file", np.uint16),
+        ("simulation_event", np.int32),
+        ("noise_file", np.uint16),
+        ("noise_event", np.int32),
+        ("translation_x", np.int16),
+        ("translation_y", np.int16),
+        ("rotation", np.uint8),
+    ]
+)
+
+
+class SampleRecords:
+    """Table of the provenance of generated samples, indexed by sample id.
+
+    Files and events are referenced by position in the file and key tables
+    given here, which must follow the order of the datasets passed to
+    ``generate_data``.
+
+    Args:
+        simulation_keys: Event keys of every simulation file, keyed by path.
+        noise_keys: Event keys of every noise file, keyed by path.
+        edges: ``(xmin, xmax, ymin, ymax)`` window kept from every image.
+        capacity: Number of records preallocated, the table grows as needed.
+    """
+
+    def __init__(
+        self,
+        simulation_keys: Mapping[str, Sequence[str]],
+        noise_keys: Mapping[str, Sequence[str]],
+        edges: Sequence[int],
+        capacity: int = 1024,
+    ):
+        self.simulation_files = list(simulation_keys)
+        self.noise_files = list(noise_keys)
+        self.edges = [int(edge) for edge in edges]
+        self._simulation_keys = [list(keys) for keys in simulation_keys.values()]
+        self._noise_keys = [list(keys) for keys in noise_keys.values()]
+        self._table = np.zeros(max(capacity, 1), dtype=RECORD_DTYPE)
+        self._size = 0
+        self._opened: Dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def table(self) -> NDArray:
+        """Structured array of the records, row ``i`` describing sample ``i``."""
+        return self._table[: self._size]
+
+    def append(
+        self,
+        simulation_file: int,
+        simulation_event: int,
+        noise_file: int,
+        noise_event: int,
+        translation_x: int,
+        translation_y: int,
+        rotation: int,
+    ) -> int:
+        """Records a sample and returns its id."""
+        if self._size == len(self._table):
+            self._table = np.resize(self._table, 2 * len(self._table))
+        self._table[self._size] = (
+            simulation_file,
+            simulation_event,
+            noise_file,
+            noise_event,
+            translation_x,
+            translation_y,
+            rotation,
+        )
+        self._size += 1
+        return self._size - 1
+
+    def __getitem__(self, sample_id: int) -> Dict:
+        """Returns the record of a sample with file paths and event keys resolved."""
+        if not 0 <= sample_id < self._size:
+            raise IndexError(
+                f"Sample {sample_id} out of range for {self._size} records"
+            )
+        record = self._table[sample_id]
+        simulation_file, noise_file = (
+            int(record["simulation_file"]),
+            int(record["noise_file"]),
+        )
+        return {
+            "simulation_file": self.simulation_files[simulation_file],
+            "simulation_key": self._simulation_keys[simulation_file][
+                record["simulation_event"]
+            ],
+            "noise_file": self.noise_files[noise_file],
+            "noise_key": self._noise_keys[noise_file][record["noise_event"]],
+            "translation_x": int(record["translation_x"]),
+            "translation_y": int(record["translation_y"]),
+            "rotation": int(record["rotation"]),
+        }
+
+    def sample_ids(
+        self, simulation_file: Optional[str] = None, noise_file: Optional[str] = None
+    ) -> NDArray[np.int64]:
+        """Ids of the samples built from the given simulation and/or noise file."""
+        selected = np.ones(self._size, dtype=bool)
+        if simulation_file is not None:
+            selected &= self.table["simulation_file"] == self.simulation_files.index(
+                simulation_file
+            )
+        if noise_file is not None:
+            selected &= self.table["noise_file"] == self.noise_files.index(noise_file)
+        return np.flatnonzero(selected)
+
+    def _open(self, dataset_type, filepath: str):
+        if filepath not in self._opened:
+            self._opened[filepath] = dataset_type(filepath=filepath).load()
+        return self._opened[filepath]
+
+    def replay(self, sample_id: int) -> Tuple[NDArray[np.int16], NDArray[np.int16]]:
+        """Rebuilds the noisy input and clean target of a sample from its sources."""
+        record = self[sample_id]
+        image = self._open(CygnoSimulationImage, record["simulation_file"])
+        noise = self._open(CygnoNoiseImage, record["noise_file"])
+        return augment_pair(
+            image[record["simulation_key"]],
+            noise[record["noise_key"]],
+            record["translation_x"],
+            record["translation_y"],
+            record["rotation"],
+            self.edges,
+        )
+
+    def save(self, directory: str) -> None:
+        """Saves the records column by column in ``records.npz``.
+
+        ``index.json`` holds the crop window and the key table of every file.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            directory / "records.npz",
+            **{name: self.table[name] for name in RECORD_DTYPE.names},
+        )
+        index = {
+            "edges": self.edges,
+            "simulation_keys": dict(zip(self.simulation_files, self._simulation_keys)),
+            "noise_keys": dict(zip(self.noise_files, self._noise_keys)),
+        }
+        (directory / "index.json").write_text(json.dumps(index))
+
+    @classmethod
+    def load(cls, directory: str) -> "SampleRecords":
+        """Loads saved records."""
+        directory = Path(directory)
+        index = json.loads((directory / "index.json").read_text())
+        with np.load(directory / "records.npz") as saved:
+            size = len(saved[RECORD_DTYPE.names[0]])
+            records = cls(
+                index["simulation_keys"], index["noise_keys"], index["edges"], size
+            )
+            for name in RECORD_DTYPE.names:
+                records._table[name][:size] = saved[name]
+        records._size = size
+        return records
+
+
+def load_columns(directory: str, names: List[str]) -> Dict[str, NDArray]:
+    """Reads only the given columns of saved records, e.g. to query them."""
+    with np.load(Path(directory) / "records.npz") as saved:
+        return {name: saved[name] for name in names}
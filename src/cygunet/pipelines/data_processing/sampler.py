@@ -0,0 +1,189 @@
+"""Stratified sampling of simulation events with locality-aware reads.
+
+Events are drawn stratified by particle and energy, one stratum per
+``simulation.{particle}_{energy}`` catalog entry. The reads of every batch are
+then issued in (file, on-disk offset) order so the I/O is mostly sequential,
+while the images are still emitted in a random order for training.
+"""
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from cygunet.datasets.cygno_data import HDF5GroupWrapper
+
+from .validation import event_indices
+
+# Directory name of the simulation.{particle}_{energy} files in catalog.yml.
+SIMULATION_DIRECTORY = re.compile(
+    r"LIME_no_noise_(?P<particle>.+)_(?P<energy>[^_]+)_keV"
+)
+
+
+def stratum_name(filepath: str) -> str:
+    """Returns the ``simulation.{particle}_{energy}`` entry a file belongs to."""
+    match = SIMULATION_DIRECTORY.fullmatch(Path(filepath).parent.name)
+    if match is None:
+        raise ValueError(f"Cannot infer particle and energy from {filepath}")
+    return f"simulation.{match['particle']}_{match['energy']}"
+
+
+def _particle_energy(name: str) -> Tuple[str, str]:
+    particle, energy = name.split(".")[-1].rsplit("_", 1)
+    return particle, energy
+
+
+def _offset(group, key: str) -> int:
+    """Byte offset of a dataset in its HDF5 file, first chunk if chunked."""
+    dataset_id = group[key].id
+    offset = dataset_id.get_offset()
+    if offset is None and dataset_id.get_num_chunks():
+        offset = dataset_id.get_chunk_info(0).byte_offset
+    return offset or 0
+
+
+class StratifiedSampler:
+    """Draws simulation events stratified by particle and energy.
+
+    The weight of a stratum is the product of its particle and energy weights,
+    missing weights default to 1. Every batch is allocated to the strata in
+    proportion to their weights, the remainder being distributed at random,
+    and events are drawn uniformly within a stratum, across all of its files.
+
+    Args:
+        simulations: Simulation wrappers, or lists of wrappers when a stratum
+            has several runs, keyed by their ``simulation.{particle}_{energy}``
+            catalog entry name.
+        range_mask: ``[low, high)`` event indices drawn from every file,
+            capped at the number of events of each file.
+        particle_weights: Relative weight of every particle.
+        energy_weights: Relative weight of every energy.
+        seed: Seed of the sampler's random generator.
+        bad_events: Indices of the events never drawn, keyed like
+            ``simulations`` and given per file, in the same order, when a
+            stratum has several runs.
+    """
+
+    def __init__(
+        self,
+        simulations: Mapping[str, Union[HDF5GroupWrapper, Sequence[HDF5GroupWrapper]]],
+        range_mask: Sequence[int],
+        particle_weights: Optional[Mapping] = None,
+        energy_weights: Optional[Mapping] = None,
+        seed: Optional[int] = None,
+        bad_events: Optional[Mapping[str, Sequence]] = None,
+    ):
+        self._names = sorted(simulations)
+        bad_events = bad_events or {}
+        # Every file is a slot, the slots of a stratum are contiguous
+        self._simulations: List[HDF5GroupWrapper] = []
+        self._slots: List[NDArray[np.int64]] = []
+        self._events: List[NDArray[np.int64]] = []
+        for name in self._names:
+            group = simulations[name]
+            bad = bad_events.get(name)
+            if not isinstance(group, (list, tuple)):
+                group, bad = [group], [bad]
+            first = len(self._simulations)
+            for ds, skipped in zip(group, bad or [None] * len(group)):
+                events = event_indices(len(ds), range_mask, skipped)
+                if not len(events):
+                    raise ValueError(
+                        f"A file of {name} has {len(ds)} events, none in range_mask "
+                        f"{range_mask} once its bad events are skipped"
+                    )
+                self._simulations.append(ds)
+                self._events.append(events)
+            self._slots.append(np.arange(first, len(self._simulations)))
+        # Cumulative event counts of the slots of every stratum
+        self._bounds = [
+            np.cumsum([len(self._events[slot]) for slot in slots])
+            for slots in self._slots
+        ]
+
+        particle_weights = {str(k): v for k, v in (particle_weights or {}).items()}
+        energy_weights = {str(k): v for k, v in (energy_weights or {}).items()}
+        weights = np.array(
+            [
+                particle_weights.get(particle, 1) * energy_weights.get(energy, 1)
+                for particle, energy in map(_particle_energy, self._names)
+            ],
+            dtype=np.float64,
+        )
+        if not weights.sum() > 0:
+            raise ValueError("At least one stratum must have a positive weight")
+        self.probabilities = weights / weights.sum()
+        self._rng = np.random.default_rng(seed)
+        self._offsets: Dict[Tuple[int, int], int] = {}
+
+    @property
+    def strata(self) -> List[str]:
+        return list(self._names)
+
+    def allocate(self, n: int) -> NDArray[np.int64]:
+        """Splits ``n`` draws across the strata in proportion to their weights."""
+        expected = n * self.probabilities
+        counts = np.floor(expected).astype(np.int64)
+        remainder = n - counts.sum()
+        if remainder:
+            fractions = expected - counts
+            extra = self._rng.choice(
+                len(counts),
+                size=remainder,
+                replace=False,
+                p=fractions / fractions.sum(),
+            )
+            counts[extra] += 1
+        return counts
+
+    def sample(self, n: int) -> List[Tuple[int, int]]:
+        """Draws ``n`` events as ``(file slot, event index)`` in random order.
+
+        Slots number the files in stratum order, a stratum with a single
+        file has the stratum's index as slot.
+        """
+        draws = []
+        for stratum, count in enumerate(self.allocate(n)):
+            bounds = self._bounds[stratum]
+            picks = self._rng.integers(0, bounds[-1], size=count)
+            files = np.searchsorted(bounds, picks, side="right")
+            offsets = picks - np.concatenate([[0], bounds[:-1]])[files]
+            for file, offset in zip(files, offsets):
+                slot = int(self._slots[stratum][file])
+                draws.append((slot, int(self._events[slot][offset])))
+        return [draws[i] for i in self._rng.permutation(len(draws))]
+
+    def _read_key(self, draw: Tuple[int, int]) -> Tuple[int, int]:
+        if draw not in self._offsets:
+            slot, index = draw
+            ds = self._simulations[slot]
+            self._offsets[draw] = _offset(ds.group, ds.keys[index])
+        return draw[0], self._offsets[draw]
+
+    def read(self, draws: Sequence[Tuple[int, int]]) -> List[NDArray]:
+        """Reads the drawn events in (file, offset) order, returned in draw order."""
+        images: List[Optional[NDArray]] = [None] * len(draws)
+        for i in sorted(range(len(draws)), key=lambda i: self._read_key(draws[i])):
+            slot, index = draws[i]
+            images[i] = self._simulations[slot][index]
+        return images
+
+    def events(
+        self, n: int, batch_size: int
+    ) -> Iterator[Tuple[HDF5GroupWrapper, int, NDArray]]:
+        """Yields ``n`` stratified events as ``(simulation, event index, image)``.
+
+        Every batch is read whole, in on-disk order, before its events are
+        yielded, so up to ``batch_size`` images are held in memory at once.
+        """
+        for start in range(0, n, batch_size):
+            draws = self.sample(min(batch_size, n - start))
+            for (slot, index), image in zip(draws, self.read(draws)):
+                yield self._simulations[slot], index, image
+
+    def images(self, n: int, batch_size: int) -> Iterator[NDArray]:
+        """Yields ``n`` stratified images, read ``batch_size`` events at a time."""
+        for _, _, image in self.events(n, batch_size):
+            yield image
@@ -0,0 +1,148 @@
+"""Spark-backed generation of training pairs.
+
+The event index space is split into partitions which are generated on the
+executors. Every executor opens the HDF5/ROOT sources itself, so only file
+paths and parameters travel from the driver, and the generated pairs come
+back as compact image records ready to be written as Parquet shards. Every
+record holds the event keys and the augmentation of its pair, so the pair can
+be rebuilt from the sources with ``augment_pair``.
+"""
+from __future__ import annotations
+
+import random
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from cygunet.datasets import CygnoNoiseImage, CygnoSimulationImage, load_files
+
+from .utils import augment_pair, draw_augmentation, expand_files
+from .validation import drawable_events
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from pyspark.sql import DataFrame as SparkDataFrame
+
+# Kept as a DDL string so that importing the pipeline does not import pyspark.
+IMAGE_RECORD_SCHEMA = (
+    "event_id BIGINT NOT NULL, "
+    "simulation_file STRING NOT NULL, "
+    "simulation_key STRING NOT NULL, "
+    "noise_file STRING NOT NULL, "
+    "noise_key STRING NOT NULL, "
+    "translation_x SMALLINT NOT NULL, "
+    "translation_y SMALLINT NOT NULL, "
+    "rotation TINYINT NOT NULL, "
+    "height INT NOT NULL, "
+    "width INT NOT NULL, "
+    "noisy BINARY NOT NULL, "
+    "clean BINARY NOT NULL"
+)
+
+
+def _generate_partition(
+    partition_index: int,
+    event_ids: Iterable[int],
+    simulation_files: List[str],
+    noise_files: List[str],
+    parameters: Dict,
+    bad_events: Optional[Dict[str, List[int]]] = None,
+) -> Iterator[Tuple]:
+    """Generates the image records of one partition on an executor.
+
+    Every partition is seeded with ``seed + partition_index`` so the output
+    does not depend on how partitions are scheduled on executors. Sources are
+    recorded by event key, which identifies the event whatever was skipped.
+    """
+    seed = parameters.get("seed", 0) + partition_index
+    random.seed(seed)
+    np.random.seed(seed)
+
+    concurrency = parameters.get("load_concurrency", 16)
+    bad_events = bad_events or {}
+    masks = load_files(CygnoSimulationImage, simulation_files, concurrency)
+    noises = load_files(CygnoNoiseImage, noise_files, concurrency)
+    mask_events = drawable_events(
+        masks, parameters["range_mask"], [bad_events.get(f) for f in simulation_files]
+    )
+    noise_events = drawable_events(
+        noises, parameters["range_noise"], [bad_events.get(f) for f in noise_files]
+    )
+    for event_id in event_ids:
+        mask_file = random.randrange(len(masks))
+        noise_file = random.randrange(len(noises))
+        events = mask_events[mask_file]
+        mask_index = int(events[np.random.randint(len(events))])
+        events = noise_events[noise_file]
+        noise_index = int(events[np.random.randint(len(events))])
+        augmentation = draw_augmentation(parameters["max_translation"])
+        noisy, clean = augment_pair(
+            masks[mask_file][mask_index],
+            noises[noise_file][noise_index],
+            *augmentation,
+            parameters["cut_edges"],
+        )
+        yield (
+            event_id,
+            simulation_files[mask_file],
+            masks[mask_file].keys[mask_index],
+            noise_files[noise_file],
+            noises[noise_file].keys[noise_index],
+            *augmentation,
+            clean.shape[0],
+            clean.shape[1],
+            np.ascontiguousarray(noisy).tobytes(),
+            np.ascontiguousarray(clean).tobytes(),
+        )
+
+
+def generate_data_spark(
+    parameters: Dict, bad_events: Optional[Dict[str, List[int]]] = None
+) -> SparkDataFrame:
+    """Generates noisy/clean training pairs on the Spark executors.
+
+    Args:
+        parameters: Parameters defined in parameters_data_processing.yml.
+        bad_events: Indices of the events of every file to skip, as found by
+            ``validate_inputs``.
+    Returns:
+        Spark DataFrame of image records, one row per generated pair.
+    """
+    from pyspark.sql import SparkSession
+
+    spark = SparkSession.builder.getOrCreate()
+    simulation_files = expand_files(parameters["simulation_files"])
+    noise_files = expand_files(parameters["noise_files"])
+    num_partitions = (
+        parameters.get("num_partitions") or spark.sparkContext.defaultParallelism
+    )
+
+    events = spark.sparkContext.parallelize(
+        range(parameters["max_events"]), num_partitions
+    )
+    records = events.mapPartitionsWithIndex(
+        partial(
+            _generate_partition,
+            simulation_files=simulation_files,
+            noise_files=noise_files,
+            parameters=dict(parameters),
+            bad_events=dict(bad_events or {}),
+        )
+    )
+    return spark.createDataFrame(records, IMAGE_RECORD_SCHEMA)
+
+
+def decode_image_records(
+    records: pd.DataFrame,
+) -> Tuple[NDArray[np.int16], NDArray[np.int16]]:
+    """Decodes image records back into ``(N, H, W)`` noisy and clean stacks."""
+    shape = (
+        len(records),
+        int(records["height"].iloc[0]),
+        int(records["width"].iloc[0]),
+    )
+    noisy = np.frombuffer(b"".join(records["noisy"]), dtype=np.int16).reshape(shape)
+    clean = np.frombuffer(b"".join(records["clean"]), dtype=np.int16).reshape(shape)
+    return noisy, clean
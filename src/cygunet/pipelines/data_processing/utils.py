@@ -1,10 +1,26 @@
-from typing import Dict, Tuple
-from numpy.typing import NDArray  
+import glob
+import random
+from typing import Dict, List, Sequence, Tuple, Union
 
-def random_translate(image: NDArray[np.int16], max_translation: int=100) -> NDArray[np.int16]:
+import numpy as np
+from numpy.typing import NDArray
+
+INT16_MIN = np.iinfo(np.int16).min
+INT16_MAX = np.iinfo(np.int16).max
+
+
+def expand_files(patterns: Union[str, Sequence[str]]) -> List[str]:
+    """Expands one or more glob patterns into a sorted list of files."""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    files = sorted({f for pattern in patterns for f in glob.glob(pattern)})
+    if not files:
+        raise FileNotFoundError(f"No files match {patterns}")
+    return files
+
+
+def translate(image: NDArray[np.int16], translation_x: int, translation_y: int) -> NDArray[np.int16]:
     image = np.array(image)
-    translation_x = np.random.randint(-max_translation, max_translation)
-    translation_y = np.random.randint(-max_translation, max_translation)
     new_image = np.zeros_like(image)
     activated_pixels_x, activated_pixels_y = np.where(image > 0)
     new_x = np.clip(activated_pixels_x + translation_x, 0, image.shape[0] - 1)
@@ -14,10 +30,82 @@ def random_translate(image: NDArray[np.int16], max_translation: int=100) -> NDAr
     return new_image
 
 
+def random_translate(image: NDArray[np.int16], max_translation: int=100) -> NDArray[np.int16]:
+    translation_x = np.random.randint(-max_translation, max_translation)
+    translation_y = np.random.randint(-max_translation, max_translation)
+    return translate(image, translation_x, translation_y)
+
+
 def random_rotate(image: NDArray[np.int16]) -> NDArray[np.int16]:
     k = random.choice(range(0, 3))
     return np.rot90(image, k=k)
 
 
 def cut_edges(image: NDArray[np.int16], xmin:int, xmax:int, ymin:int, ymax:int) -> NDArray[np.int16]:
-    return image[xmin: xmax, ymin: ymax]
\ No newline at end of file
+    return image[xmin: xmax, ymin: ymax]
+
+
+def overlay_noise(image: NDArray[np.int16], noise: NDArray) -> NDArray[np.int16]:
+    """Adds a noise frame on top of a clean simulated image.
+
+    The sum is accumulated in int32 and clipped back to the int16 range so
+    bright tracks on top of hot pixels cannot wrap around.
+    """
+    noisy = image.astype(np.int32) + np.asarray(noise, dtype=np.int32)
+    return np.clip(noisy, INT16_MIN, INT16_MAX).astype(np.int16)
+
+
+def draw_augmentation(max_translation: int) -> Tuple[int, int, int]:
+    """Draws the translation and number of quarter turns of one training pair.
+
+    The draws are made from the same generators and in the same order as
+    ``random_translate`` followed by ``random_rotate``.
+    """
+    translation_x = np.random.randint(-max_translation, max_translation)
+    translation_y = np.random.randint(-max_translation, max_translation)
+    rotation = random.choice(range(0, 3))
+    return translation_x, translation_y, rotation
+
+
+def augment_pair(
+    image: NDArray[np.int16],
+    noise: NDArray,
+    translation_x: int,
+    translation_y: int,
+    rotation: int,
+    edges: Sequence[int],
+) -> Tuple[NDArray[np.int16], NDArray[np.int16]]:
+    """Applies a given augmentation to a clean image and overlays it with noise.
+
+    Args:
+        image: Clean simulated image.
+        noise: Camera noise frame with the same shape as ``image``.
+        translation_x: Translation in pixels along the first axis.
+        translation_y: Translation in pixels along the second axis.
+        rotation: Number of quarter turns applied after the translation.
+        edges: ``(xmin, xmax, ymin, ymax)`` window kept after augmentation.
+    Returns:
+        The noisy input and the clean target, both cropped to ``edges``.
+    """
+    clean = np.rot90(translate(image, translation_x, translation_y), k=rotation)
+    noisy = overlay_noise(clean, noise)
+    return cut_edges(noisy, *edges), cut_edges(clean, *edges)
+
+
+def make_training_pair(
+    image: NDArray[np.int16],
+    noise: NDArray,
+    max_translation: int,
+    edges: Sequence[int],
+) -> Tuple[NDArray[np.int16], NDArray[np.int16]]:
+    """Augments a clean image and overlays it with noise.
+
+    Args:
+        image: Clean simulated image.
+        noise: Camera noise frame with the same shape as ``image``.
+        max_translation: Maximum translation in pixels along each axis.
+        edges: ``(xmin, xmax, ymin, ymax)`` window kept after augmentation.
+    Returns:
+        The noisy input and the clean target, both cropped to ``edges``.
+    """
+    return augment_pair(image, noise, *draw_augmentation(max_translation), edges)
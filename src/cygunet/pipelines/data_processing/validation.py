@@ -0,0 +1,271 @@
+"""Single-pass validation of the raw simulation and noise files.
+
+Every file is streamed once, ``batch_size`` events at a time. The events of a
+batch are stacked and checked with whole-batch reductions, so the cost is one
+read of every event plus a handful of vectorised passes over the batch. The
+indices of the bad events are kept per file so that the generation only draws
+from the remaining events and never reads them. Results can be cached per
+file, so unchanged files are not scanned again on later runs.
+"""
+import json
+import logging
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from cygunet.datasets import CygnoNoiseImage, CygnoSimulationImage, load_files
+from cygunet.datasets.cygno_data import HDF5GroupWrapper, LazyROOTData
+
+from .cache import cache_key, code_version
+from .utils import expand_files
+
+logger = logging.getLogger(__name__)
+
+# Reasons an event is flagged, in the order they are reported.
+CHECKS = ("unreadable", "wrong_shape", "wrong_dtype", "nan", "negative", "saturated")
+
+
+def _most_common(values: List) -> Optional[object]:
+    """Most frequent value, the first one seen on ties."""
+    common = Counter(values).most_common(1)
+    return common[0][0] if common else None
+
+
+def _empty_histogram(bin_edges: NDArray) -> List:
+    return [np.zeros(len(bin_edges) - 1, dtype=np.int64), np.inf, -np.inf]
+
+
+def validate_events(
+    data: Union[HDF5GroupWrapper, LazyROOTData],
+    batch_size: int,
+    bin_edges: NDArray,
+    saturation: float,
+    max_saturated_pixels: int = 0,
+) -> Tuple[Dict, NDArray[np.int64]]:
+    """Checks every event of a file and histograms the intensity of the good ones.
+
+    The most common shape and dtype of the file are the reference, so a bad
+    first event does not condemn the others. Events are flagged when they
+    cannot be read, when their shape or dtype differ from the reference, when
+    they hold NaN or negative pixels, or more than ``max_saturated_pixels``
+    pixels at or above ``saturation``.
+
+    Args:
+        data: Loaded simulation or noise file.
+        batch_size: Number of events stacked and checked at once.
+        bin_edges: Edges of the pixel intensity histogram.
+        saturation: Pixel value at which the sensor saturates.
+        max_saturated_pixels: Saturated pixels tolerated in an event.
+    Returns:
+        A report of the file and the sorted indices of its bad events.
+    """
+    n_events = len(data)
+    flagged = {check: np.zeros(n_events, dtype=bool) for check in CHECKS}
+    shapes: List[Optional[Tuple[int, ...]]] = [None] * n_events
+    dtypes: List[Optional[np.dtype]] = [None] * n_events
+    # Histogram, minimum and maximum of the good events of every (shape, dtype)
+    histograms: Dict[Tuple, List] = {}
+    saturated_pixels = 0
+
+    for start in range(0, n_events, batch_size):
+        groups: Dict[Tuple, Dict[int, NDArray]] = {}
+        for i in range(start, min(start + batch_size, n_events)):
+            try:
+                event = np.asarray(data[i])
+            except Exception as error:
+                flagged["unreadable"][i] = True
+                logger.warning("Cannot read event %d: %r", i, error)
+                continue
+            shapes[i], dtypes[i] = event.shape, event.dtype
+            groups.setdefault((event.shape, event.dtype), {})[i] = event
+
+        # Events are stacked by shape and dtype, the reference is only known at the end
+        for group, events in groups.items():
+            index = np.fromiter(events, dtype=np.int64, count=len(events))
+            pixels = np.stack(list(events.values())).reshape(len(events), -1)
+            if np.issubdtype(pixels.dtype, np.floating):
+                flagged["nan"][index] = np.isnan(pixels).any(axis=1)
+            flagged["negative"][index] = (pixels < 0).any(axis=1)
+            saturated = (pixels >= saturation).sum(axis=1)
+            flagged["saturated"][index] = saturated > max_saturated_pixels
+            saturated_pixels += int(saturated.sum())
+
+            good = ~np.logical_or.reduce(
+                [flagged[check][index] for check in ("nan", "negative", "saturated")]
+            )
+            if good.any():
+                histogram = histograms.setdefault(group, _empty_histogram(bin_edges))
+                histogram[0] += np.histogram(pixels[good], bins=bin_edges)[0]
+                histogram[1] = min(histogram[1], float(pixels[good].min()))
+                histogram[2] = max(histogram[2], float(pixels[good].max()))
+
+    readable = ~flagged["unreadable"]
+    shape = _most_common([shapes[i] for i in np.flatnonzero(readable)])
+    dtype = _most_common(
+        [dtypes[i] for i in np.flatnonzero(readable) if shapes[i] == shape]
+    )
+    flagged["wrong_shape"] = readable & np.array(
+        [s != shape for s in shapes], dtype=bool
+    )
+    flagged["wrong_dtype"] = readable & np.array(
+        [d != dtype for d in dtypes], dtype=bool
+    )
+    counts, low, high = histograms.get((shape, dtype), _empty_histogram(bin_edges))
+
+    bad = np.flatnonzero(np.logical_or.reduce([flagged[check] for check in CHECKS]))
+    report = {
+        "events": n_events,
+        "shape": list(shape) if shape is not None else None,
+        "dtype": str(dtype) if dtype is not None else None,
+        "bad_events": len(bad),
+        **{check: int(flagged[check].sum()) for check in CHECKS},
+        "saturated_pixels": saturated_pixels,
+        "min": low if np.isfinite(low) else None,
+        "max": high if np.isfinite(high) else None,
+        "histogram": {
+            "edges": np.asarray(bin_edges).tolist(),
+            "counts": counts.tolist(),
+        },
+    }
+    return report, bad
+
+
+def event_indices(
+    n_events: int, event_range: Sequence[int], skipped: Optional[Sequence[int]] = None
+) -> NDArray[np.int64]:
+    """Indices of the events of a file that can be drawn.
+
+    These are the indices in the ``[low, high)`` ``event_range``, capped at the
+    number of events of the file, without the ``skipped`` ones. Indices are
+    those of the file's keys, so they identify the same events as the bad
+    event indices and the provenance records.
+    """
+    events = np.arange(event_range[0], min(event_range[1], n_events))
+    if skipped:
+        events = np.setdiff1d(events, np.asarray(skipped, dtype=np.int64))
+    return events
+
+
+def drawable_events(
+    datasets: Sequence[Union[HDF5GroupWrapper, LazyROOTData]],
+    event_range: Sequence[int],
+    bad_events: Optional[Sequence[Optional[Sequence[int]]]] = None,
+) -> List[NDArray[np.int64]]:
+    """Indices of the events that can be drawn from every loaded file.
+
+    Args:
+        datasets: Loaded simulation or noise files.
+        event_range: ``[low, high)`` event indices drawn from every file.
+        bad_events: Indices of the bad events of every file, in the same order.
+    Returns:
+        The ``event_indices`` of every file.
+    Raises:
+        ValueError: If a file has no event left to draw.
+    """
+    bad_events = bad_events or [None] * len(datasets)
+    events = []
+    for i, (data, bad) in enumerate(zip(datasets, bad_events)):
+        events.append(event_indices(len(data), event_range, bad))
+        if not len(events[-1]):
+            raise ValueError(
+                f"File {i} has {len(data)} events, none left in {list(event_range)} "
+                "once its bad events are skipped"
+            )
+    return events
+
+
+def _cached_validation(cache_dir: Path, key: str) -> Optional[Tuple[Dict, List[int]]]:
+    entry = cache_dir / f"{key}.json"
+    if not entry.exists():
+        return None
+    cached = json.loads(entry.read_text())
+    return cached["report"], cached["bad_events"]
+
+
+def _cache_validation(cache_dir: Path, key: str, report: Dict, bad: List[int]) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    staging = cache_dir / f".{key}.{os.getpid()}"
+    staging.write_text(json.dumps({"report": report, "bad_events": bad}))
+    os.replace(staging, cache_dir / f"{key}.json")
+
+
+def validate_inputs(
+    generation: Dict, parameters: Dict
+) -> Tuple[Dict[str, Dict], Dict[str, List[int]]]:
+    """Validates the simulation and noise files used to generate training pairs.
+
+    With a ``cache_dir``, the result of every file is stored under a key of
+    its fingerprint, the validation parameters and the code version, and
+    files which did not change since are not read again.
+
+    Args:
+        generation: Generation parameters, whose ``simulation_files`` and
+            ``noise_files`` are validated.
+        parameters: Validation parameters defined in parameters_data_processing.yml.
+    Returns:
+        A report per file, and the bad event indices of every file with any.
+    """
+    histogram = parameters["histogram"]
+    bin_edges = np.linspace(*histogram["range"], histogram["bins"] + 1)
+    concurrency = generation.get("load_concurrency", 16)
+    cache_dir = parameters.get("cache_dir")
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+    version = code_version() if cache_dir is not None else None
+
+    report, bad_events = {}, {}
+    for source, dataset_type in (
+        ("simulation", CygnoSimulationImage),
+        ("noise", CygnoNoiseImage),
+    ):
+        checks = {
+            "source": source,
+            "saturation": parameters["saturation"][source],
+            "max_saturated_pixels": parameters.get("max_saturated_pixels", 0),
+            "histogram": histogram,
+        }
+        results, keys, stale = {}, {}, []
+        for filepath in expand_files(generation[f"{source}_files"]):
+            if cache_dir is not None:
+                keys[filepath] = cache_key(
+                    [filepath], {**checks, "code_version": version}
+                )
+                results[filepath] = _cached_validation(cache_dir, keys[filepath])
+            if results.get(filepath) is None:
+                stale.append(filepath)
+        if len(stale) < len(results):
+            logger.info(
+                "%d %s files unchanged since validated",
+                len(results) - len(stale),
+                source,
+            )
+
+        for filepath, data in zip(
+            stale, load_files(dataset_type, stale, concurrency, warm=False)
+        ):
+            file_report, bad = validate_events(
+                data,
+                parameters["batch_size"],
+                bin_edges,
+                checks["saturation"],
+                checks["max_saturated_pixels"],
+            )
+            file_report["source"] = source
+            results[filepath] = file_report, bad.tolist()
+            if cache_dir is not None:
+                _cache_validation(cache_dir, keys[filepath], *results[filepath])
+
+        for filepath, (file_report, bad) in results.items():
+            report[filepath] = file_report
+            if bad:
+                bad_events[filepath] = bad
+                logger.warning(
+                    "%d of %d events of %s are bad",
+                    len(bad),
+                    file_report["events"],
+                    filepath,
+                )
+    return report, bad_events
@@ -1,10 +1,11 @@
+from __future__ import annotations
+
 import logging
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Dict, Tuple
 
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import max_error, mean_absolute_error, r2_score
-from sklearn.model_selection import train_test_split
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
 
 
 def split_data(data: pd.DataFrame, parameters: Dict) -> Tuple:
@@ -16,6 +17,8 @@ def split_data(data: pd.DataFrame, parameters: Dict) -> Tuple:
     Returns:
         Split data.
     """
+    from sklearn.model_selection import train_test_split
+
     X = data[parameters["features"]]
     y = data["price"]
     X_train, X_test, y_train, y_test = train_test_split(
@@ -34,6 +37,8 @@ def train_model(X_train: pd.DataFrame, y_train: pd.Series) -> LinearRegression:
     Returns:
         Trained model.
     """
+    from sklearn.linear_model import LinearRegression
+
     regressor = LinearRegression()
     regressor.fit(X_train, y_train)
     return regressor
@@ -49,6 +54,8 @@ def evaluate_model(
         X_test: Testing data of independent features.
         y_test: Testing data for price.
     """
+    from sklearn.metrics import max_error, mean_absolute_error, r2_score
+
     y_pred = regressor.predict(X_test)
     score = r2_score(y_test, y_pred)
     mae = mean_absolute_error(y_test, y_pred)
@@ -0,0 +1,3 @@
+"""Inference pipeline applying a trained denoiser to full camera frames"""
+
+from .pipeline import create_pipeline  # NOQA
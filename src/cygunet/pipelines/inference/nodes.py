@@ -0,0 +1,197 @@
+import logging
+import time
+import tracemalloc
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import NDArray
+
+from cygunet.datasets import CygnoNoiseImage
+from cygunet.hooks import peak_rss_mb
+
+from ..data_processing.utils import expand_files
+
+logger = logging.getLogger(__name__)
+
+
+def _tile_starts(length: int, tile: int, stride: int) -> NDArray[np.intp]:
+    starts = list(range(0, length - tile + 1, stride))
+    if starts[-1] != length - tile:
+        starts.append(length - tile)
+    return np.array(starts)
+
+
+def _blend_window(tile: int, overlap: int) -> NDArray[np.float32]:
+    """Weights tapering linearly to the tile borders across the overlap.
+
+    Every weight is strictly positive, so pixels covered by a single tile
+    are reproduced unchanged after normalisation.
+    """
+    ramp = np.minimum(np.arange(1, tile + 1), np.arange(tile, 0, -1))
+    ramp = np.minimum(ramp, overlap + 1) / (overlap + 1)
+    return np.outer(ramp, ramp).astype(np.float32)
+
+
+def _predict(model: Any, batch: NDArray[np.float32]) -> NDArray[np.float32]:
+    predict = getattr(model, "predict", model)
+    return np.asarray(predict(batch), dtype=np.float32).reshape(batch.shape)
+
+
+def denoise_frame(
+    frame: NDArray,
+    model: Any,
+    tile_size: int,
+    overlap: int,
+    batch_size: int,
+) -> NDArray[np.float32]:
+    """Denoises a full frame with a model trained on smaller tiles.
+
+    The frame is cut into overlapping ``tile_size`` tiles which are passed to
+    the model ``batch_size`` at a time, and the predictions are blended back
+    into a full frame with weights tapering across the overlaps.
+
+    Args:
+        frame: Full ``(H, W)`` camera frame.
+        model: Denoiser exposing ``predict`` or callable on ``(B, h, w)`` batches.
+        tile_size: Side of the square tiles seen by the model.
+        overlap: Number of pixels shared by neighbouring tiles.
+        batch_size: Number of tiles per model call.
+    Returns:
+        The denoised ``(H, W)`` frame.
+    """
+    frame = np.asarray(frame, dtype=np.float32)
+    height, width = frame.shape
+    tile = min(tile_size, height, width)
+    overlap = min(overlap, tile - 1)
+    ys, xs = np.meshgrid(
+        _tile_starts(height, tile, tile - overlap),
+        _tile_starts(width, tile, tile - overlap),
+        indexing="ij",
+    )
+    ys, xs = ys.ravel(), xs.ravel()
+    tiles = sliding_window_view(frame, (tile, tile))
+    window = _blend_window(tile, overlap)
+
+    denoised = np.zeros_like(frame)
+    weights = np.zeros_like(frame)
+    for start in range(0, len(ys), batch_size):
+        batch_ys, batch_xs = (
+            ys[start : start + batch_size],
+            xs[start : start + batch_size],
+        )
+        predictions = _predict(model, tiles[batch_ys, batch_xs])
+        for y, x, prediction in zip(batch_ys, batch_xs, predictions):
+            denoised[y : y + tile, x : x + tile] += prediction * window
+            weights[y : y + tile, x : x + tile] += window
+    return denoised / weights
+
+
+def _read_run(filepath: str) -> NDArray[np.float32]:
+    """Reads every frame of a run into a float32 stack.
+
+    TH2 histograms are read as float64, so frames are cast one at a time
+    into the preallocated stack instead of stacking them at full precision.
+    """
+    frames = CygnoNoiseImage(filepath).load()
+    stack = None
+    for i in range(len(frames)):
+        frame = frames[i]
+        if stack is None:
+            stack = np.empty((len(frames), *np.shape(frame)), dtype=np.float32)
+        stack[i] = frame
+    return stack if stack is not None else np.empty((0, 0, 0), dtype=np.float32)
+
+
+def _run_name(filepath: str) -> str:
+    path = Path(filepath)
+    return f"{path.parent.name}_{path.stem.replace('histograms_Run', '')}"
+
+
+def denoise_runs(
+    model: Any, parameters: Dict
+) -> Tuple[Dict[str, Callable[[], NDArray[np.float32]]], Dict[str, Dict[str, float]]]:
+    """Applies a trained denoiser to every frame of the selected noise runs.
+
+    Every run is returned as a lazy partition, so ``PartitionedDataset``
+    denoises and saves the runs one at a time and only one run's output is
+    held in memory. Runs are read by a bounded thread pool, ``prefetch`` runs
+    ahead of the one being denoised, so reading overlaps with compute. Memory
+    is thus bounded per run, not per frame: ``prefetch + 1`` float32 input
+    stacks and one float32 output stack, 20 MB per 2304 x 2304 frame each.
+
+    The report is filled as the partitions are denoised, so the node must list
+    the partitions before the report in its outputs, which Kedro saves in order.
+
+    Args:
+        model: Trained denoiser, see ``denoise_frame``.
+        parameters: Parameters defined in parameters_inference.yml.
+    Returns:
+        The loaders of the denoised ``(N, H, W)`` frames of every run and a
+        per-run report of throughput in frames per second, peak traced Python
+        memory and peak RSS of the process, which includes memory allocated
+        outside Python, e.g. by the model.
+    """
+    filepaths = sorted(expand_files(parameters["noise_files"]), key=_run_name)
+    prefetch = max(parameters.get("prefetch", 1), 1)
+    pool = ThreadPoolExecutor(max_workers=prefetch)
+    pending: Dict[int, Future] = {}
+    remaining = set(range(len(filepaths)))
+    report: Dict[str, Dict[str, float]] = {}
+
+    def read(i: int) -> NDArray:
+        remaining.discard(i)
+        for j in range(i, min(i + prefetch + 1, len(filepaths))):
+            if j not in pending and (j == i or j in remaining):
+                pending[j] = pool.submit(_read_run, filepaths[j])
+        frames = pending.pop(i).result()
+        if not remaining:
+            pool.shutdown(wait=False)
+        return frames
+
+    def denoise(i: int) -> NDArray[np.float32]:
+        frames = read(i)
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            outputs = np.empty_like(frames)
+            for j, frame in enumerate(frames):
+                outputs[j] = denoise_frame(
+                    frame,
+                    model,
+                    parameters["tile_size"],
+                    parameters["overlap"],
+                    parameters["batch_size"],
+                )
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+        name = _run_name(filepaths[i])
+        report[name] = {
+            "frames": len(frames),
+            "seconds": elapsed,
+            "frames_per_second": len(frames) / elapsed,
+            "peak_memory_mb": peak / 2**20,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        logger.info(
+            "Denoised run %s: %d frames at %.2f frames/s, peak memory %.1f MB, peak RSS %.1f MB",
+            name,
+            len(frames),
+            report[name]["frames_per_second"],
+            report[name]["peak_memory_mb"],
+            report[name]["peak_rss_mb"],
+        )
+        return outputs
+
+    denoised = {_run_name(f): partial(denoise, i) for i, f in enumerate(filepaths)}
+    return denoised, report
@@ -0,0 +1,17 @@
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import denoise_runs
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    return pipeline(
+        [
+            node(
+                func=denoise_runs,
+                inputs=["denoiser", "params:inference"],
+                # The report is filled while the partitions are saved, keep it last
+                outputs=["denoised_frames", "inference_report"],
+                name="denoise_runs_node",
+            ),
+        ]
+    )
@@ -1,3 +1,3 @@
-"""Complete reporting pipeline for the spaceflights tutorial"""
+"""Reporting pipeline summarising and plotting the track features"""
 
-from .pipeline import create_pipeline # NOQA
+from .pipeline import create_pipeline  # NOQA
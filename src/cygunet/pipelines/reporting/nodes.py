@@ -1,68 +1,178 @@
-import matplotlib.pyplot as plt
-import pandas as pd
-import plotly.express as px  # noqa:  F401
-import plotly.graph_objs as go
-import seaborn as sn
-from pyspark.sql import DataFrame as SparkDataFrame
-from pyspark.sql import SparkSession
-
-
-# This function uses plotly.express
-def compare_passenger_capacity_exp(preprocessed_shuttles: SparkDataFrame):
-    spark = SparkSession.builder.appName("PassengerCapacityComparison").getOrCreate()
-
-    # Register the DataFrame as a temporary table
-    preprocessed_shuttles.createOrReplaceTempView("shuttles")
-
-    # Perform the grouping and aggregation using SQL
-    query = """
-            SELECT shuttle_type, AVG(passenger_capacity) as passenger_capacity
-            FROM shuttles
-            GROUP BY shuttle_type
-        """
-    grouped_data = spark.sql(query)
-    # Convert Spark DataFrame to Pandas for visualization
-    pandas_grouped_data = grouped_data.toPandas()
-    return pandas_grouped_data
-
-
-def compare_passenger_capacity_go(preprocessed_shuttles: SparkDataFrame):
-    spark = SparkSession.builder.appName("PassengerCapacityComparison").getOrCreate()
-
-    # Register the DataFrame as a temporary table
-    preprocessed_shuttles.createOrReplaceTempView("shuttles")
-
-    # Perform the grouping and aggregation using SQL
-    query = """
-        SELECT shuttle_type, AVG(passenger_capacity) as avg_passenger_capacity
-        FROM shuttles
-        GROUP BY shuttle_type
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objs as go
+
+# pandas, scipy and plotly are imported inside the nodes so that loading the
+# pipeline definitions does not pay for them.
+
+TRACK_FEATURES = [
+    "event",
+    "track",
+    "intensity",
+    "pixels",
+    "x_min",
+    "x_max",
+    "y_min",
+    "y_max",
+    "x_barycentre",
+    "y_barycentre",
+    "principal_axis_length",
+]
+
+# Pixels are connected to their 8 in-plane neighbours, never across events.
+_STRUCTURE = np.zeros((3, 3, 3), dtype=bool)
+_STRUCTURE[1] = True
+
+
+def track_features(images: NDArray, threshold: float = 0) -> Dict[str, NDArray]:
+    """Computes the features of every track of a batch of images at once.
+
+    Tracks are the connected components of the pixels above ``threshold``.
+    All features are computed with ``bincount``-style reductions over the
+    labelled pixels of the whole batch, without looping over events or tracks.
+    Barycentres and principal axes are intensity-weighted. The principal-axis
+    length is ``sqrt(12 * variance)`` along the major axis, pixels counting as
+    unit squares, i.e. the length of a uniform straight track.
+
+    Args:
+        images: ``(N, H, W)`` stack, or a single ``(H, W)`` image.
+        threshold: Pixels above this value belong to tracks.
+    Returns:
+        Columns of ``TRACK_FEATURES``, one row per track, ordered by event.
     """
-    grouped_data = spark.sql(query)
+    from scipy import ndimage
 
-    # Convert Spark DataFrame to Pandas for visualization
-    pandas_grouped_data = grouped_data.toPandas()
+    images = np.asarray(images)
+    if images.ndim == 2:
+        images = images[np.newaxis]
+    labels, n_tracks = ndimage.label(images > threshold, structure=_STRUCTURE)
 
-    # Create the Plotly figure
-    fig = go.Figure(
-        [
-            go.Bar(
-                x=pandas_grouped_data["shuttle_type"],
-                y=pandas_grouped_data["avg_passenger_capacity"],
-            )
-        ]
-    )
+    pixels = np.flatnonzero(labels)
+    label = labels.ravel()[pixels]
+    event, y, x = np.unravel_index(pixels, images.shape)
+    weight = images.ravel()[pixels].astype(np.float64)
 
-    return fig
+    def total(values):
+        return np.bincount(label, weights=values, minlength=n_tracks + 1)[1:]
+
+    count = np.bincount(label, minlength=n_tracks + 1)[1:]
+    intensity = total(weight)
+    mean_x = total(weight * x) / intensity
+    mean_y = total(weight * y) / intensity
+    var_x = total(weight * x * x) / intensity - mean_x**2
+    var_y = total(weight * y * y) / intensity - mean_y**2
+    cov_xy = total(weight * x * y) / intensity - mean_x * mean_y
+    major = (var_x + var_y) / 2 + np.sqrt(((var_x - var_y) / 2) ** 2 + cov_xy**2)
+    # Variance of a pixel's extent, a single pixel is one pixel long
+    major += 1 / 12
+
+    bounds = {}
+    for name, coordinate in (("x", x), ("y", y)):
+        low = np.full(n_tracks + 1, np.iinfo(np.int64).max)
+        high = np.full(n_tracks + 1, -1)
+        np.minimum.at(low, label, coordinate)
+        np.maximum.at(high, label, coordinate)
+        bounds[f"{name}_min"], bounds[f"{name}_max"] = low[1:], high[1:]
 
+    track_event = np.empty(n_tracks + 1, dtype=np.int64)
+    track_event[label] = event
+    track_event = track_event[1:]
+    # ndimage.label numbers components in raster order, so by event
+    first_track = np.searchsorted(track_event, track_event)
 
-def create_confusion_matrix(companies: pd.DataFrame):
-    actuals = [0, 1, 0, 0, 1, 1, 1, 0, 1, 0, 1]
-    predicted = [1, 1, 0, 1, 0, 1, 0, 0, 0, 1, 1]
-    data = {"y_Actual": actuals, "y_Predicted": predicted}
-    df = pd.DataFrame(data, columns=["y_Actual", "y_Predicted"])
-    confusion_matrix = pd.crosstab(
-        df["y_Actual"], df["y_Predicted"], rownames=["Actual"], colnames=["Predicted"]
+    return {
+        "event": track_event,
+        "track": np.arange(n_tracks) - first_track,
+        "intensity": intensity,
+        "pixels": count,
+        **bounds,
+        "x_barycentre": mean_x,
+        "y_barycentre": mean_y,
+        "principal_axis_length": np.sqrt(12 * np.clip(major, 0, None)),
+    }
+
+
+def extract_track_features(images: NDArray, parameters: Dict) -> pd.DataFrame:
+    """Builds the track feature table of an image stack.
+
+    Args:
+        images: ``(N, H, W)`` stack, e.g. clean simulation masks.
+        parameters: Parameters defined in parameters_reporting.yml.
+    Returns:
+        One row per track with at least ``min_pixels`` pixels.
+    """
+    import pandas as pd
+
+    batch_size = parameters["batch_size"]
+    batches = []
+    for start in range(0, len(images), batch_size):
+        features = pd.DataFrame(
+            track_features(images[start : start + batch_size], parameters["threshold"]),
+            columns=TRACK_FEATURES,
+        )
+        features["event"] += start
+        batches.append(features)
+    if not batches:
+        return pd.DataFrame(columns=TRACK_FEATURES)
+    features = pd.concat(batches, ignore_index=True)
+    return features[features["pixels"] >= parameters["min_pixels"]].reset_index(
+        drop=True
     )
-    sn.heatmap(confusion_matrix, annot=True)
-    return plt
+
+
+def extract_run_track_features(
+    runs: Dict[str, Union[NDArray, Callable[[], NDArray]]], parameters: Dict
+) -> pd.DataFrame:
+    """Builds the track feature table of every run, e.g. denoised frames.
+
+    Args:
+        runs: ``(N, H, W)`` stacks keyed by run, or their partition loaders.
+        parameters: Parameters defined in parameters_reporting.yml.
+    Returns:
+        One row per track with at least ``min_pixels`` pixels, with a ``run`` column.
+    """
+    import pandas as pd
+
+    tables = []
+    for run, images in sorted(runs.items()):
+        features = extract_track_features(
+            images() if callable(images) else images, parameters
+        )
+        features.insert(0, "run", run)
+        tables.append(features)
+    if not tables:
+        return pd.DataFrame(columns=["run", *TRACK_FEATURES])
+    return pd.concat(tables, ignore_index=True)
+
+
+def plot_track_features(
+    clean_features: pd.DataFrame, denoised_features: pd.DataFrame
+) -> go.Figure:
+    """Compares the track feature distributions of clean masks and denoised frames."""
+    import plotly.graph_objs as go
+    from plotly.subplots import make_subplots
+
+    columns = ["intensity", "pixels", "principal_axis_length"]
+    fig = make_subplots(rows=1, cols=len(columns), subplot_titles=columns)
+    for name, features in (("clean", clean_features), ("denoised", denoised_features)):
+        for col, column in enumerate(columns, start=1):
+            fig.add_trace(
+                go.Histogram(
+                    x=features[column],
+                    name=name,
+                    legendgroup=name,
+                    showlegend=col == 1,
+                    opacity=0.6,
+                ),
+                row=1,
+                col=col,
+            )
+    fig.update_layout(barmode="overlay", title="Track features")
+    return fig
@@ -1,30 +1,33 @@
 from kedro.pipeline import Pipeline, node, pipeline
 
 from .nodes import (
-    compare_passenger_capacity_exp,
-    compare_passenger_capacity_go,
-    create_confusion_matrix,
+    extract_run_track_features,
+    extract_track_features,
+    plot_track_features,
 )
 
 
 def create_pipeline(**kwargs) -> Pipeline:
-    """This is a simple pipeline which generates a pair of plots"""
+    """Summarises the tracks of the clean masks and denoised frames and plots them"""
     return pipeline(
         [
             node(
-                func=compare_passenger_capacity_exp,
-                inputs="preprocessed_shuttles",
-                outputs="shuttle_passenger_capacity_plot_exp",
+                func=extract_track_features,
+                inputs=["clean_images", "params:track_features"],
+                outputs="clean_track_features",
+                name="extract_clean_track_features_node",
             ),
             node(
-                func=compare_passenger_capacity_go,
-                inputs="preprocessed_shuttles",
-                outputs="shuttle_passenger_capacity_plot_go",
+                func=extract_run_track_features,
+                inputs=["denoised_frames", "params:track_features"],
+                outputs="denoised_track_features",
+                name="extract_denoised_track_features_node",
             ),
             node(
-                func=create_confusion_matrix,
-                inputs="companies",
-                outputs="dummy_confusion_matrix",
+                func=plot_track_features,
+                inputs=["clean_track_features", "denoised_track_features"],
+                outputs="track_features_plot",
+                name="plot_track_features_node",
             ),
         ]
     )
@@ -1,12 +1,18 @@
-# """Project settings. There is no need to edit this file unless you want to change values
-# from the Kedro defaults. For further information, including these default values, see
-# https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
-
-# # Instantiated project hooks.
-# from cygunet.hooks import SparkHooks  # noqa: E402
-
-# # Hooks are executed in a Last-In-First-Out (LIFO) order.
-# HOOKS = (SparkHooks(),)
+"""Project settings. There is no need to edit this file unless you want to change values
+from the Kedro defaults. For further information, including these default values, see
+https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
+
+# Instantiated project hooks.
+from cygunet.hooks import PerformanceHooks, SparkHooks  # noqa: E402
+
+# Hooks are executed in a Last-In-First-Out (LIFO) order.
+HOOKS = (
+    # Starts a SparkSession with conf/*/spark.yml before the first `spark` node.
+    SparkHooks(),
+    # Writes a JSON report per run to data/09_tracking/performance.
+    # Add node names to `profile_nodes` to capture them with cProfile.
+    PerformanceHooks(profile_nodes=()),
+)
 
 # # Installed plugins for which to disable hook auto-registration.
 # # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
@@ -24,18 +30,18 @@
 # # Directory that holds configuration.
 # # CONF_SOURCE = "conf"
 
-# # Class that manages how configuration is loaded.
-# from kedro.config import OmegaConfigLoader  # noqa: E402
-
-# CONFIG_LOADER_CLASS = OmegaConfigLoader
-# # Keyword arguments to pass to the `CONFIG_LOADER_CLASS` constructor.
-# CONFIG_LOADER_ARGS = {
-#     "base_env": "base",
-#     "default_run_env": "local",
-#     "config_patterns": {
-#         "spark": ["spark*", "spark*/**"],
-#     }
-# }
+# Class that manages how configuration is loaded.
+from kedro.config import OmegaConfigLoader  # noqa: E402
+
+CONFIG_LOADER_CLASS = OmegaConfigLoader
+# Keyword arguments to pass to the `CONFIG_LOADER_CLASS` constructor.
+CONFIG_LOADER_ARGS = {
+    "base_env": "base",
+    "default_run_env": "local",
+    "config_patterns": {
+        "spark": ["spark*", "spark*/**"],
+    },
+}
 
 # # Class that manages Kedro's library components.
 # # from kedro.framework.context import KedroContext
@@ -0,0 +1,28 @@
+"""Synthetic CYGNO-like input files shared by the tests."""
+import pytest
+
+from benchmarks.fixtures import write_noise, write_simulation
+
+
+@pytest.fixture
+def simulation_file(tmp_path):
+    return write_simulation(tmp_path / "histograms_Run00001.h5")
+
+
+@pytest.fixture
+def noise_file(tmp_path):
+    return write_noise(tmp_path / "histograms_Run00001.root")
+
+
+@pytest.fixture
+def generation_parameters(simulation_file, noise_file):
+    return {
+        "simulation_files": str(simulation_file),
+        "noise_files": str(noise_file),
+        "range_mask": [0, 8],
+        "range_noise": [0, 8],
+        "max_translation": 4,
+        "cut_edges": [8, 56, 8, 56],
+        "max_events": 6,
+        "seed": 3,
+    }
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from cygunet.datasets import CygnoNoiseImage, load_datasets, load_files, match_factory
+from cygunet.datasets.bulk import aload
+from kedro.io import DataCatalog
+
+from benchmarks.fixtures import write_noise
+
+
+@pytest.fixture
+def catalog_config(tmp_path):
+    for camera in ["cam1", "cam2"]:
+        (tmp_path / camera).mkdir()
+        for run in ["00001", "00002"]:
+            write_noise(
+                tmp_path / camera / f"histograms_Run{run}.root", n_events=2, size=8
+            )
+    (tmp_path / "cam1" / "notes.txt").touch()
+    return {
+        "noise.{camera}_{runid}": {
+            "type": "cygunet.datasets.CygnoNoiseImage",
+            "filepath": str(tmp_path / "{camera}" / "histograms_Run{runid}.root"),
+        }
+    }
+
+
+def test_match_factory(catalog_config):
+    assert match_factory(catalog_config, "noise.{camera}_{runid}") == [
+        "noise.cam1_00001",
+        "noise.cam1_00002",
+        "noise.cam2_00001",
+        "noise.cam2_00002",
+    ]
+
+
+def test_load_datasets(catalog_config):
+    catalog = DataCatalog.from_config(catalog_config)
+    names = match_factory(catalog_config, "noise.{camera}_{runid}")
+    loaded = load_datasets(catalog, names, max_concurrency=2)
+
+    assert list(loaded) == names
+    assert loaded["noise.cam2_00001"][1].shape == (8, 8)
+    with pytest.raises(FileNotFoundError):
+        load_datasets(catalog, ["noise.cam3_00001"])
+
+
+def test_load_files_keeps_order(noise_file):
+    loaded = load_files(CygnoNoiseImage, [str(noise_file)] * 3)
+
+    assert len(loaded) == 3
+    np.testing.assert_array_equal(loaded[0][0], loaded[2][0])
+
+
+def test_load_files_within_running_loop(noise_file):
+    async def main():
+        return load_files(CygnoNoiseImage, [str(noise_file)] * 2)
+
+    loaded = asyncio.run(main())
+
+    assert len(loaded) == 2
+    np.testing.assert_array_equal(
+        loaded[1][0], CygnoNoiseImage(str(noise_file)).load()[0]
+    )
+
+
+def test_aload_runs_concurrently_within_limit():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def loader():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return []
+
+    start = time.perf_counter()
+    loaded = asyncio.run(aload({i: loader for i in range(8)}, max_concurrency=4))
+    elapsed = time.perf_counter() - start
+
+    assert list(loaded) == list(range(8))
+    assert peak == 4
+    assert elapsed < 8 * 0.05
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from cygunet.datasets import CygnoImageStack
+from kedro.io import DatasetError
+
+
+@pytest.fixture
+def stack():
+    return np.arange(4 * 3 * 2, dtype=np.int16).reshape(4, 3, 2)
+
+
+def test_in_memory_handover_is_read_only_and_copy_free(stack):
+    dataset = CygnoImageStack()
+    dataset.save(stack)
+    loaded = dataset.load()
+
+    assert np.shares_memory(loaded, stack)
+    assert not loaded.flags.writeable
+    with pytest.raises(ValueError):
+        loaded[0, 0, 0] = 1
+
+
+def test_on_disk_roundtrip_is_memory_mapped(tmp_path, stack):
+    dataset = CygnoImageStack(filepath=str(tmp_path / "stack.npy"))
+    assert not dataset.exists()
+    dataset.save(stack)
+    loaded = dataset.load()
+
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, stack)
+
+
+@pytest.mark.parametrize("filepath", [None, "stack.npy"])
+def test_partial_load(tmp_path, stack, filepath):
+    dataset = CygnoImageStack(
+        filepath=filepath and str(tmp_path / filepath),
+        load_args={"start": 1, "stop": 3},
+    )
+    dataset.save(stack)
+
+    np.testing.assert_array_equal(dataset.load(), stack[1:3])
+
+
+def test_overwrite_keeps_open_maps_valid(tmp_path, stack):
+    dataset = CygnoImageStack(filepath=str(tmp_path / "stack.npy"))
+    dataset.save(stack)
+    previous = dataset.load()
+    dataset.save(stack * 2)
+
+    np.testing.assert_array_equal(previous, stack)
+    np.testing.assert_array_equal(dataset.load(), stack * 2)
+
+
+def test_save_rejects_non_stacks():
+    with pytest.raises(DatasetError, match="Expected an"):
+        CygnoImageStack().save(np.zeros((3, 2)))
+
+
+def test_load_before_save_raises():
+    with pytest.raises(DatasetError, match="has not been saved yet"):
+        CygnoImageStack().load()
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+from cygunet.datasets import CygnoNoiseImage, CygnoPyramid, CygnoSimulationImage
+from cygunet.datasets.rebin import rebin
+from kedro.io import DatasetError
+
+
+@pytest.mark.parametrize(
+    "source, dataset_type, filename",
+    [
+        ("simulation", CygnoSimulationImage, "simulation_file"),
+        ("noise", CygnoNoiseImage, "noise_file"),
+    ],
+)
+def test_pyramid_levels(tmp_path, request, source, dataset_type, filename):
+    filepath = request.getfixturevalue(filename)
+    dataset = CygnoPyramid(
+        str(filepath), source, cache_dir=str(tmp_path / "cache"), batch_size=3
+    )
+    levels = dataset.load()
+
+    events = dataset_type(str(filepath)).load()
+    full = np.rint(np.stack([events[i] for i in range(len(events))])).astype(np.int32)
+    assert sorted(levels) == [2, 4, 8]
+    for factor, level in levels.items():
+        assert isinstance(level, np.memmap)
+        assert level.shape == (8, 64 // factor, 64 // factor)
+        np.testing.assert_array_equal(level, rebin(full, factor))
+
+
+def test_pyramid_is_cached_until_source_changes(tmp_path, simulation_file, mocker):
+    dataset = CygnoPyramid(
+        str(simulation_file), "simulation", str(tmp_path), factor="4"
+    )
+    assert dataset.load().shape == (8, 16, 16)
+
+    build = mocker.spy(CygnoPyramid, "build")
+    dataset.load()
+    build.assert_not_called()
+
+    os.utime(simulation_file, ns=(0, 0))
+    dataset.load()
+    build.assert_called_once()
+
+
+def test_pyramid_rejects_unknown_source(simulation_file):
+    with pytest.raises(ValueError):
+        CygnoPyramid(str(simulation_file), "other")
+
+
+def test_pyramid_is_read_only(simulation_file, tmp_path):
+    dataset = CygnoPyramid(str(simulation_file), "simulation", str(tmp_path))
+    with pytest.raises(DatasetError, match="read-only"):
+        dataset.save(np.zeros((1, 8, 8)))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from cygunet.datasets.rebin import rebin
+
+
+def _loop_rebin(image, factor):
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    out = np.zeros((height, width), dtype=np.int64)
+    for i in range(height):
+        for j in range(width):
+            out[i, j] = image[
+                i * factor : (i + 1) * factor, j * factor : (j + 1) * factor
+            ].sum()
+    return out
+
+
+@pytest.mark.parametrize("factor", [1, 2, 3, 8])
+def test_rebin_matches_block_sums(factor):
+    image = np.random.default_rng(0).integers(-100, 100, size=(37, 50)).astype(np.int16)
+    np.testing.assert_array_equal(rebin(image, factor), _loop_rebin(image, factor))
+
+
+def test_rebin_stack():
+    stack = np.random.default_rng(0).integers(0, 100, size=(3, 16, 24)).astype(np.int16)
+    rebinned = rebin(stack, 4)
+
+    assert rebinned.shape == (3, 4, 6)
+    for image, expected in zip(rebinned, stack):
+        np.testing.assert_array_equal(image, _loop_rebin(expected, 4))
+
+
+def test_rebin_does_not_overflow_int16():
+    image = np.full((16, 16), np.iinfo(np.int16).max, dtype=np.int16)
+    rebinned = rebin(image, 16)
+
+    assert rebinned.dtype == np.int32
+    assert rebinned[0, 0] == 256 * np.iinfo(np.int16).max
+
+
+def test_rebin_rejects_non_positive_factor():
+    with pytest.raises(ValueError):
+        rebin(np.zeros((4, 4)), 0)
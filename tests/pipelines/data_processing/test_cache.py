@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from cygunet.pipelines.data_processing import nodes
+from cygunet.pipelines.data_processing.cache import (
+    GenerationCache,
+    cache_key,
+    code_version,
+)
+from cygunet.pipelines.data_processing.nodes import generate_data_cached
+
+
+@pytest.fixture
+def cache_options(tmp_path):
+    return {"directory": str(tmp_path / "cache"), "max_size_gb": None}
+
+
+def test_cache_key_depends_on_inputs_and_parameters(simulation_file, noise_file):
+    files = [str(simulation_file), str(noise_file)]
+    key = cache_key(files, {"seed": 1})
+
+    assert cache_key(reversed(files), {"seed": 1}) == key
+    assert cache_key(files, {"seed": 2}) != key
+    os.utime(noise_file, ns=(0, 0))
+    assert cache_key(files, {"seed": 1}) != key
+
+
+def test_generate_data_cached_hit_skips_generation(
+    generation_parameters, cache_options, mocker
+):
+    noisy, clean, _ = generate_data_cached(generation_parameters, cache_options)
+    spy = mocker.spy(nodes, "generate_data")
+    cached_noisy, cached_clean, _ = generate_data_cached(
+        generation_parameters, cache_options
+    )
+
+    spy.assert_not_called()
+    assert isinstance(cached_noisy, np.memmap)
+    assert noisy.shape == (6, 48, 48)
+    np.testing.assert_array_equal(cached_noisy, noisy)
+    np.testing.assert_array_equal(cached_clean, clean)
+
+
+def test_generate_data_cached_miss_on_new_seed(
+    generation_parameters, cache_options, mocker
+):
+    generate_data_cached(generation_parameters, cache_options)
+    spy = mocker.spy(nodes, "generate_data")
+    generate_data_cached({**generation_parameters, "seed": 4}, cache_options)
+
+    spy.assert_called_once()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    array = np.zeros(1000, dtype=np.int16)
+    cache = GenerationCache(str(tmp_path), max_bytes=5000)
+    cache.put("a", [array, array])
+    os.utime(tmp_path / "a", ns=(1, 1))
+    cache.put("b", [array, array])
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_cache_miss_writes_pairs_into_staged_files(
+    generation_parameters, cache_options, mocker
+):
+    allocated = []
+    generate_data = nodes.generate_data
+
+    def recording_generate_data(*args, allocate, **kwargs):
+        def recording_allocate(shape):
+            allocated.append(allocate(shape))
+            return allocated[-1]
+
+        return generate_data(*args, allocate=recording_allocate, **kwargs)
+
+    mocker.patch.object(nodes, "generate_data", recording_generate_data)
+    noisy, clean, _ = generate_data_cached(generation_parameters, cache_options)
+
+    ((staged_noisy, staged_clean),) = allocated
+    assert isinstance(staged_noisy, np.memmap)
+    np.testing.assert_array_equal(noisy, staged_noisy)
+    np.testing.assert_array_equal(clean, staged_clean)
+
+
+def test_failed_generation_leaves_no_staging(
+    generation_parameters, cache_options, mocker
+):
+    mocker.patch.object(
+        nodes, "draw_augmentation", side_effect=[(0, 0, 0), RuntimeError]
+    )
+
+    with pytest.raises(RuntimeError):
+        generate_data_cached(generation_parameters, cache_options)
+    assert not any(
+        p.name.startswith(".") for p in Path(cache_options["directory"]).iterdir()
+    )
+
+
+@pytest.mark.parametrize(
+    "package, module",
+    [
+        ("data_processing", "sampler.py"),
+        ("data_processing", "validation.py"),
+        ("datasets", "cygno_data.py"),
+    ],
+)
+def test_code_version_covers_generation_modules(package, module, mocker):
+    version = code_version()
+    read_bytes = Path.read_bytes
+
+    def edited(path):
+        content = read_bytes(path)
+        if path.parent.name == package and path.name == module:
+            content += b"# edited"
+        return content
+
+    mocker.patch.object(Path, "read_bytes", edited)
+    assert code_version() != version
+
+
+def test_generate_data_cached_rejects_no_events(generation_parameters, cache_options):
+    with pytest.raises(ValueError, match="max_events must be at least 1"):
+        generate_data_cached({**generation_parameters, "max_events": 0}, cache_options)
+    assert not Path(cache_options["directory"]).exists()
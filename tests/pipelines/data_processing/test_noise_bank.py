@@ -0,0 +1,112 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+from cygunet.pipelines.data_processing.noise_bank import NoiseBank, build_noise_bank
+
+from benchmarks.fixtures import write_noise
+
+
+class Frames:
+    """Run of constant frames recording which frames are read."""
+
+    def __init__(self, value, n):
+        self.value, self.n, self.read = value, n, []
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        self.read.append(index)
+        return np.full((4, 4), self.value * 100 + index)
+
+
+def _runs_of(bank):
+    return Counter(bank._owner[bank._owner >= 0].tolist())
+
+
+def test_reads_only_kept_frames():
+    bank = NoiseBank(capacity=5, seed=0)
+    run = Frames(1, 50)
+
+    assert bank.add_run("a", run) == 5
+    assert len(run.read) == 5
+    assert len(bank) == 5
+
+
+def test_runs_share_the_bank_equally():
+    bank = NoiseBank(capacity=12, seed=0)
+    for i, name in enumerate("abc"):
+        bank.add_run(name, Frames(i, 100))
+
+    assert _runs_of(bank) == {0: 4, 1: 4, 2: 4}
+    # Slots keep the frames of the run they belong to
+    owners = bank._owner[bank._owner >= 0]
+    frames = bank._frames[bank._owner >= 0]
+    assert ((frames[:, 0, 0] // 100) == owners).all()
+    assert bank.add_run("a", Frames(0, 100)) == 0
+
+
+def test_short_runs_keep_every_frame():
+    bank = NoiseBank(capacity=10, seed=0)
+    bank.add_run("short", Frames(0, 2))
+    bank.add_run("long", Frames(1, 100))
+
+    # The long run takes the slots the short run cannot fill
+    assert _runs_of(bank) == {0: 2, 1: 8}
+
+
+def test_remainder_slots_are_used():
+    bank = NoiseBank(capacity=10, seed=0)
+    for i in range(6):
+        bank.add_run(str(i), Frames(i, 100))
+
+    counts = _runs_of(bank)
+    assert len(bank) == 10
+    assert sorted(counts.values()) == [1, 1, 2, 2, 2, 2]
+
+
+def test_rejects_more_runs_than_capacity():
+    bank = NoiseBank(capacity=2, seed=0)
+    bank.add_run("a", Frames(0, 10))
+    bank.add_run("b", Frames(1, 10))
+
+    with pytest.raises(ValueError, match="already has 2 runs"):
+        bank.add_run("c", Frames(2, 10))
+    assert _runs_of(bank) == {0: 1, 1: 1}
+
+
+def test_save_and_update_incrementally(tmp_path):
+    bank = NoiseBank(capacity=6, seed=0)
+    bank.add_run("a", Frames(0, 10))
+    bank.save(tmp_path)
+
+    saved = np.load(tmp_path / "frames.npy", mmap_mode="r")
+    assert saved.shape == (6, 4, 4)
+
+    reloaded = NoiseBank.load(tmp_path, seed=1)
+    reloaded.add_run("b", Frames(1, 10))
+    assert _runs_of(reloaded) == {0: 3, 1: 3}
+
+
+def test_build_noise_bank(tmp_path):
+    for camera in ["cam1", "cam2"]:
+        (tmp_path / camera).mkdir()
+        for run in ["00001", "00002"]:
+            write_noise(
+                tmp_path / camera / f"histograms_Run{run}.root", n_events=4, size=8
+            )
+    parameters = {
+        "noise_files": str(tmp_path / "*" / "histograms_Run*.root"),
+        "directory": str(tmp_path / "bank"),
+        "capacity": 4,
+        "seed": 0,
+    }
+
+    assert build_noise_bank(parameters) == {
+        "cam1": {"runs": 2, "frames": 4},
+        "cam2": {"runs": 2, "frames": 4},
+    }
+    write_noise(tmp_path / "cam1" / "histograms_Run00003.root", n_events=4, size=8)
+    assert build_noise_bank(parameters)["cam1"] == {"runs": 3, "frames": 4}
+    assert np.load(tmp_path / "bank" / "cam1" / "frames.npy").shape == (4, 8, 8)
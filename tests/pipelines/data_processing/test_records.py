@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from cygunet.pipelines.data_processing.nodes import generate_data_cached
+from cygunet.pipelines.data_processing.records import (
+    RECORD_DTYPE,
+    SampleRecords,
+    load_columns,
+)
+
+from benchmarks.fixtures import write_simulation
+
+
+def _assert_replays(records, noisy, clean):
+    for sample_id in range(len(records)):
+        replayed_noisy, replayed_clean = records.replay(sample_id)
+        np.testing.assert_array_equal(replayed_noisy, noisy[sample_id])
+        np.testing.assert_array_equal(replayed_clean, clean[sample_id])
+
+
+def test_record_is_compact():
+    assert RECORD_DTYPE.itemsize == 17
+
+
+def test_generated_samples_replay_exactly(generation_parameters, tmp_path):
+    noisy, clean, records = generate_data_cached(
+        generation_parameters, {"directory": str(tmp_path / "cache")}
+    )
+
+    assert len(records) == 6
+    _assert_replays(records, noisy, clean)
+
+
+def test_bad_events_are_never_drawn(
+    generation_parameters, simulation_file, noise_file, tmp_path
+):
+    bad_events = {str(simulation_file): [0, 1, 2], str(noise_file): [0, 1, 2]}
+    noisy, clean, records = generate_data_cached(
+        {**generation_parameters, "max_events": 32},
+        {"directory": str(tmp_path / "cache")},
+        bad_events,
+    )
+
+    assert records.table["simulation_event"].min() >= 3
+    assert records.table["noise_event"].min() >= 3
+    _assert_replays(records, noisy, clean)
+
+
+def test_cache_hit_serves_saved_records(generation_parameters, tmp_path):
+    cache_options = {"directory": str(tmp_path / "cache")}
+    _, _, records = generate_data_cached(generation_parameters, cache_options)
+    noisy, clean, cached = generate_data_cached(generation_parameters, cache_options)
+
+    np.testing.assert_array_equal(cached.table, records.table)
+    _assert_replays(cached, noisy, clean)
+
+
+def test_sampled_samples_replay_exactly(generation_parameters, tmp_path):
+    for particle in ["electron", "He"]:
+        directory = tmp_path / f"LIME_no_noise_{particle}_10_keV"
+        directory.mkdir()
+        write_simulation(directory / "histograms_Run00001.h5")
+    parameters = {
+        **generation_parameters,
+        "simulation_files": str(tmp_path / "LIME_no_noise_*_keV" / "*.h5"),
+        "sampling": {"particle_weights": {"He": 3}, "batch_size": 4},
+    }
+    noisy, clean, records = generate_data_cached(
+        parameters, {"directory": str(tmp_path / "cache")}
+    )
+
+    _assert_replays(records, noisy, clean)
+
+
+def test_save_load_and_query(tmp_path):
+    records = SampleRecords(
+        {"a.h5": ["event_0", "event_1"], "b.h5": ["event_0"]},
+        {"run.root": ["ev0", "ev1"]},
+        [0, 4, 0, 4],
+        capacity=1,
+    )
+    for i in range(5):
+        records.append(i % 2, 0, 0, i % 2, i, -i, i % 3)
+    records.save(tmp_path)
+    loaded = SampleRecords.load(tmp_path)
+
+    assert len(loaded) == 5
+    np.testing.assert_array_equal(loaded.table, records.table)
+    assert loaded[3] == {
+        "simulation_file": "b.h5",
+        "simulation_key": "event_0",
+        "noise_file": "run.root",
+        "noise_key": "ev1",
+        "translation_x": 3,
+        "translation_y": -3,
+        "rotation": 0,
+    }
+    assert loaded.sample_ids(simulation_file="a.h5").tolist() == [0, 2, 4]
+    assert loaded.sample_ids(
+        simulation_file="b.h5", noise_file="run.root"
+    ).tolist() == [1, 3]
+    assert load_columns(tmp_path, ["rotation"])["rotation"].tolist() == [0, 1, 2, 0, 1]
+    with pytest.raises(IndexError):
+        loaded[5]
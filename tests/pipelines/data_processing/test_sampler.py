@@ -0,0 +1,143 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+from cygunet.datasets import CygnoSimulationImage
+from cygunet.datasets.cygno_data import HDF5GroupWrapper
+from cygunet.pipelines.data_processing.nodes import generate_data_cached
+from cygunet.pipelines.data_processing.sampler import StratifiedSampler, stratum_name
+
+from benchmarks.fixtures import write_simulation
+
+
+@pytest.fixture
+def simulation_files(tmp_path):
+    files = []
+    for seed, (particle, energy) in enumerate(
+        [("electron", 10), ("electron", 60), ("He", 10), ("He", 60)]
+    ):
+        directory = tmp_path / f"LIME_no_noise_{particle}_{energy}_keV"
+        directory.mkdir()
+        files.append(write_simulation(directory / "histograms_Run00001.h5", seed=seed))
+    return files
+
+
+@pytest.fixture
+def simulations(simulation_files):
+    return {
+        stratum_name(f): CygnoSimulationImage(str(f)).load() for f in simulation_files
+    }
+
+
+def test_stratum_name(simulation_files):
+    assert stratum_name(simulation_files[2]) == "simulation.He_10"
+    with pytest.raises(ValueError):
+        stratum_name("data/01_raw/other/histograms_Run00001.h5")
+
+
+def test_allocate_follows_weights(simulations):
+    sampler = StratifiedSampler(
+        simulations, [0, 8], particle_weights={"He": 3}, energy_weights={60: 0}, seed=0
+    )
+    counts = dict(zip(sampler.strata, sampler.allocate(40)))
+
+    assert counts == {
+        "simulation.He_10": 30,
+        "simulation.He_60": 0,
+        "simulation.electron_10": 10,
+        "simulation.electron_60": 0,
+    }
+    assert sampler.allocate(3).sum() == 3
+
+
+def test_sample_is_balanced_and_shuffled(simulations):
+    sampler = StratifiedSampler(simulations, [0, 8], seed=0)
+    draws = sampler.sample(40)
+
+    assert Counter(stratum for stratum, _ in draws) == {0: 10, 1: 10, 2: 10, 3: 10}
+    assert [stratum for stratum, _ in draws] != sorted(stratum for stratum, _ in draws)
+
+
+def test_read_is_sequential_but_keeps_draw_order(simulations, mocker):
+    sampler = StratifiedSampler(simulations, [0, 8], seed=0)
+    draws = sampler.sample(16)
+    reads = []
+    getitem = HDF5GroupWrapper.__getitem__
+
+    def recording_getitem(self, key):
+        reads.append((self.group.filename, self.group[self.keys[key]].id.get_offset()))
+        return getitem(self, key)
+
+    mocker.patch.object(HDF5GroupWrapper, "__getitem__", recording_getitem)
+    images = sampler.read(draws)
+    mocker.stopall()
+
+    assert reads == sorted(reads)
+    names = sampler.strata
+    for image, (stratum, index) in zip(images, draws):
+        np.testing.assert_array_equal(image, simulations[names[stratum]][index])
+
+
+def test_generate_data_cached_with_sampling(
+    simulation_files, generation_parameters, tmp_path
+):
+    parameters = {
+        **generation_parameters,
+        "simulation_files": str(tmp_path / "LIME_no_noise_*_keV" / "*.h5"),
+        "sampling": {"particle_weights": {"He": 0}, "batch_size": 4},
+    }
+    noisy, clean, _ = generate_data_cached(
+        parameters, {"directory": str(tmp_path / "cache")}
+    )
+
+    assert noisy.shape == clean.shape == (6, 48, 48)
+
+
+def test_stratum_with_several_runs_draws_from_all(tmp_path):
+    directory = tmp_path / "LIME_no_noise_electron_10_keV"
+    directory.mkdir()
+    runs = [
+        CygnoSimulationImage(
+            str(write_simulation(directory / f"run{i}.h5", seed=i))
+        ).load()
+        for i in (1, 2)
+    ]
+    sampler = StratifiedSampler({"simulation.electron_10": runs}, [0, 8], seed=0)
+    draws = sampler.sample(200)
+
+    assert Counter(slot for slot, _ in draws).keys() == {0, 1}
+    images = list(sampler.events(4, batch_size=2))
+    assert all(ds in runs for ds, _, _ in images)
+
+
+def test_generate_data_cached_uses_every_run_of_a_stratum(
+    generation_parameters, tmp_path, mocker
+):
+    directory = tmp_path / "LIME_no_noise_electron_10_keV"
+    directory.mkdir()
+    for i in (1, 2):
+        write_simulation(directory / f"histograms_Run0000{i}.h5", seed=i)
+    spy = mocker.spy(StratifiedSampler, "__init__")
+    parameters = {
+        **generation_parameters,
+        "simulation_files": str(directory / "*.h5"),
+        "sampling": {},
+    }
+    generate_data_cached(parameters, {"directory": str(tmp_path / "cache")})
+
+    simulations = spy.call_args.args[1]
+    assert len(simulations["simulation.electron_10"]) == 2
+
+
+def test_rejects_files_shorter_than_range(simulations):
+    with pytest.raises(ValueError, match="none in range_mask"):
+        StratifiedSampler(simulations, [8, 16], seed=0)
+
+
+def test_skips_bad_events(simulations):
+    bad_events = {name: [0, 1, 2] for name in simulations}
+    sampler = StratifiedSampler(simulations, [0, 8], seed=0, bad_events=bad_events)
+
+    assert min(index for _, index in sampler.sample(200)) == 3
+    with pytest.raises(ValueError, match="once its bad events are skipped"):
+        StratifiedSampler(simulations, [0, 3], seed=0, bad_events=bad_events)
@@ -0,0 +1,119 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from cygunet.datasets import CygnoNoiseImage, CygnoSimulationImage
+from cygunet.pipelines.data_processing.spark import (
+    _generate_partition,
+    decode_image_records,
+    generate_data_spark,
+)
+from cygunet.pipelines.data_processing.utils import augment_pair
+
+
+@pytest.fixture
+def generation_parameters(generation_parameters):
+    return {**generation_parameters, "max_events": 12, "num_partitions": 3}
+
+
+@pytest.fixture
+def spark():
+    if shutil.which("java") is None:
+        pytest.skip("local-mode Spark needs a Java runtime")
+    from pyspark.sql import SparkSession
+
+    session = (
+        SparkSession.builder.master("local[2]")
+        .config("spark.sql.execution.arrow.pyspark.enabled", "true")
+        .getOrCreate()
+    )
+    yield session
+    session.stop()
+
+
+def _records(parameters, partition_index, event_ids, bad_events=None):
+    rows = _generate_partition(
+        partition_index,
+        event_ids,
+        [parameters["simulation_files"]],
+        [parameters["noise_files"]],
+        parameters,
+        bad_events,
+    )
+    columns = [
+        "event_id",
+        "simulation_file",
+        "simulation_key",
+        "noise_file",
+        "noise_key",
+        "translation_x",
+        "translation_y",
+        "rotation",
+        "height",
+        "width",
+        "noisy",
+        "clean",
+    ]
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+def test_generate_partition(generation_parameters):
+    records = _records(generation_parameters, 0, range(4))
+    noisy, clean = decode_image_records(records)
+
+    assert list(records["event_id"]) == [0, 1, 2, 3]
+    assert noisy.shape == clean.shape == (4, 48, 48)
+    assert noisy.dtype == clean.dtype == np.int16
+    assert (noisy >= clean).all()
+
+
+def test_generate_partition_records_replay(generation_parameters):
+    records = _records(generation_parameters, 0, range(6))
+    noisy, clean = decode_image_records(records)
+    simulation = CygnoSimulationImage(generation_parameters["simulation_files"]).load()
+    noise = CygnoNoiseImage(generation_parameters["noise_files"]).load()
+
+    for i, record in records.iterrows():
+        replayed_noisy, replayed_clean = augment_pair(
+            simulation[record["simulation_key"]],
+            noise[record["noise_key"]],
+            record["translation_x"],
+            record["translation_y"],
+            record["rotation"],
+            generation_parameters["cut_edges"],
+        )
+        np.testing.assert_array_equal(replayed_noisy, noisy[i])
+        np.testing.assert_array_equal(replayed_clean, clean[i])
+
+
+def test_generate_partition_skips_bad_events(generation_parameters):
+    bad_events = {
+        generation_parameters["simulation_files"]: [0, 1, 2],
+        generation_parameters["noise_files"]: [0, 1, 2],
+    }
+    records = _records(generation_parameters, 0, range(32), bad_events)
+    simulation = CygnoSimulationImage(generation_parameters["simulation_files"]).load()
+    noise = CygnoNoiseImage(generation_parameters["noise_files"]).load()
+
+    assert set(records["simulation_key"]) <= set(simulation.keys[3:])
+    assert set(records["noise_key"]) <= set(noise.keys[3:])
+
+
+def test_generate_partition_is_seeded_per_partition(generation_parameters):
+    first = _records(generation_parameters, 1, range(4, 8))
+    again = _records(generation_parameters, 1, range(4, 8))
+    other = _records(generation_parameters, 2, range(4, 8))
+
+    pd.testing.assert_frame_equal(first, again)
+    assert not first["noisy"].equals(other["noisy"])
+
+
+def test_generate_data_spark(spark, generation_parameters, tmp_path):
+    output = tmp_path / "training_pairs.parquet"
+    generate_data_spark(generation_parameters).write.parquet(str(output))
+
+    records = pd.read_parquet(output).sort_values("event_id")
+    noisy, clean = decode_image_records(records)
+    assert list(records["event_id"]) == list(range(12))
+    assert noisy.shape == (12, 48, 48)
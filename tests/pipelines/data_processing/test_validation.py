@@ -0,0 +1,165 @@
+import os
+
+import h5py
+import numpy as np
+import pytest
+from cygunet.datasets import CygnoSimulationImage
+from cygunet.pipelines.data_processing import validation
+from cygunet.pipelines.data_processing.validation import (
+    drawable_events,
+    event_indices,
+    validate_events,
+    validate_inputs,
+)
+
+EDGES = np.linspace(0, 400, 9)
+
+
+@pytest.fixture
+def corrupt_file(tmp_path):
+    """Simulation file whose events 1 to 5 are bad, one per check."""
+    path = tmp_path / "corrupt.h5"
+    good = np.full((8, 8), 10, dtype=np.int16)
+    events = [
+        good,
+        np.zeros((4, 8), dtype=np.int16),
+        good.astype(np.float32),
+        np.where(np.eye(8, dtype=bool), np.nan, 10).astype(np.float32),
+        np.where(np.eye(8, dtype=bool), -1, 10).astype(np.int16),
+        np.where(np.eye(8, dtype=bool), 1000, 10).astype(np.int16),
+        good,
+    ]
+    with h5py.File(path, "w") as file:
+        for i, event in enumerate(events):
+            file.create_dataset(f"event_{i:05d}", data=event)
+    return path
+
+
+def test_validate_events_flags_every_check(corrupt_file):
+    data = CygnoSimulationImage(str(corrupt_file)).load()
+    report, bad = validate_events(data, batch_size=3, bin_edges=EDGES, saturation=1000)
+
+    assert bad.tolist() == [1, 2, 3, 4, 5]
+    assert report["shape"] == [8, 8]
+    assert report["dtype"] == "int16"
+    assert {
+        check: report[check] for check in ["wrong_shape", "negative", "saturated"]
+    } == {
+        "wrong_shape": 1,
+        "negative": 1,
+        "saturated": 1,
+    }
+    # The float events are both of the wrong dtype, one of them holds NaN
+    assert report["wrong_dtype"] == 2
+    assert report["nan"] == 1
+    assert report["saturated_pixels"] == 8
+    # Only the two good events are histogrammed
+    assert sum(report["histogram"]["counts"]) == 2 * 64
+    assert report["min"] == report["max"] == 10
+
+
+def test_validate_events_tolerates_saturated_pixels(corrupt_file):
+    data = CygnoSimulationImage(str(corrupt_file)).load()
+    _, bad = validate_events(
+        data, batch_size=7, bin_edges=EDGES, saturation=1000, max_saturated_pixels=8
+    )
+
+    assert 5 not in bad.tolist()
+
+
+def test_validate_events_uses_the_most_common_shape(tmp_path):
+    path = tmp_path / "first_is_bad.h5"
+    with h5py.File(path, "w") as file:
+        file.create_dataset("event_00000", data=np.ones((3, 3), dtype=np.int16))
+        for i in range(1, 10):
+            file.create_dataset(f"event_{i:05d}", data=np.ones((8, 8), dtype=np.int16))
+    data = CygnoSimulationImage(str(path)).load()
+    report, bad = validate_events(data, batch_size=4, bin_edges=EDGES, saturation=1000)
+
+    assert bad.tolist() == [0]
+    assert report["shape"] == [8, 8]
+    assert sum(report["histogram"]["counts"]) == 9 * 64
+
+
+class _Unreadable:
+    """Wraps a loaded file, failing to read some of its events."""
+
+    def __init__(self, data, unreadable):
+        self._data = data
+        self._unreadable = unreadable
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if index in self._unreadable:
+            raise OSError("Can't read data (inflate() failed)")
+        return self._data[index]
+
+
+def test_validate_events_flags_unreadable_events(corrupt_file):
+    data = _Unreadable(CygnoSimulationImage(str(corrupt_file)).load(), {6})
+    report, bad = validate_events(data, batch_size=3, bin_edges=EDGES, saturation=1000)
+
+    assert bad.tolist() == [1, 2, 3, 4, 5, 6]
+    assert report["unreadable"] == 1
+    assert report["wrong_shape"] == 1
+    assert sum(report["histogram"]["counts"]) == 64
+
+
+def test_event_indices_keep_raw_indices():
+    assert event_indices(8, [0, 8], [0, 1, 2]).tolist() == [3, 4, 5, 6, 7]
+    assert event_indices(6, [2, 8], [7]).tolist() == [2, 3, 4, 5]
+    assert event_indices(6, [2, 8]).tolist() == [2, 3, 4, 5]
+
+
+def test_drawable_events_rejects_exhausted_files(corrupt_file):
+    data = CygnoSimulationImage(str(corrupt_file)).load()
+
+    events = drawable_events([data, data], [0, 8], [[1, 2, 3, 4, 5], None])
+    assert [e.tolist() for e in events] == [[0, 6], list(range(7))]
+    with pytest.raises(ValueError, match="File 1 has 7 events, none left"):
+        drawable_events([data, data], [0, 2], [None, [0, 1]])
+
+
+def test_validate_inputs(simulation_file, noise_file, corrupt_file):
+    generation = {
+        "simulation_files": [str(simulation_file), str(corrupt_file)],
+        "noise_files": str(noise_file),
+    }
+    parameters = {
+        "batch_size": 4,
+        "saturation": {"simulation": 1000, "noise": 65535},
+        "histogram": {"bins": 8, "range": [0, 400]},
+    }
+
+    report, bad_events = validate_inputs(generation, parameters)
+
+    assert bad_events == {str(corrupt_file): [1, 2, 3, 4, 5]}
+    assert report[str(simulation_file)]["bad_events"] == 0
+    assert report[str(noise_file)]["source"] == "noise"
+    assert report[str(noise_file)]["events"] == 8
+
+
+def test_validate_inputs_skips_unchanged_files(
+    simulation_file, noise_file, corrupt_file, tmp_path, mocker
+):
+    generation = {
+        "simulation_files": [str(simulation_file), str(corrupt_file)],
+        "noise_files": str(noise_file),
+    }
+    parameters = {
+        "batch_size": 4,
+        "saturation": {"simulation": 1000, "noise": 65535},
+        "histogram": {"bins": 8, "range": [0, 400]},
+        "cache_dir": str(tmp_path / "validation_cache"),
+    }
+    first = validate_inputs(generation, parameters)
+    validate = mocker.spy(validation, "validate_events")
+
+    assert validate_inputs(generation, parameters) == first
+    validate.assert_not_called()
+
+    os.utime(corrupt_file, ns=(0, 0))
+    assert validate_inputs(generation, parameters) == first
+    validate.assert_called_once()
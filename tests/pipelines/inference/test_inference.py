@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from cygunet.pipelines.inference.nodes import denoise_frame, denoise_runs
+from kedro_datasets.partitions import PartitionedDataset
+
+from benchmarks.fixtures import write_noise
+
+
+class IdentityModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, batch):
+        self.batch_sizes.append(len(batch))
+        return batch
+
+
+@pytest.fixture
+def inference_parameters(noise_file):
+    return {
+        "noise_files": str(noise_file),
+        "tile_size": 24,
+        "overlap": 6,
+        "batch_size": 4,
+        "prefetch": 1,
+    }
+
+
+@pytest.mark.parametrize("overlap", [0, 6, 23])
+def test_denoise_frame_blends_back_identity(overlap):
+    frame = np.random.default_rng(0).normal(size=(64, 50)).astype(np.float32)
+    model = IdentityModel()
+
+    denoised = denoise_frame(frame, model, tile_size=24, overlap=overlap, batch_size=4)
+
+    np.testing.assert_allclose(denoised, frame, rtol=1e-5, atol=1e-5)
+    assert max(model.batch_sizes) <= 4
+
+
+def test_denoise_frame_accepts_callables():
+    frame = np.ones((32, 32), dtype=np.int16)
+    denoised = denoise_frame(frame, lambda batch: batch * 0, 16, 4, 8)
+    assert denoised.shape == (32, 32)
+    assert not denoised.any()
+
+
+def test_denoise_runs(inference_parameters, noise_file):
+    denoised, report = denoise_runs(IdentityModel(), inference_parameters)
+
+    name = f"{noise_file.parent.name}_00001"
+    assert list(denoised) == [name]
+    # Runs are only denoised when their partition is saved
+    assert report == {}
+    frames = denoised[name]()
+    assert frames.shape == (8, 64, 64)
+    assert frames.dtype == np.float32
+    assert report[name]["frames"] == 8
+    assert report[name]["frames_per_second"] > 0
+    assert report[name]["peak_memory_mb"] > 0
+    assert report[name]["peak_rss_mb"] > 0
+
+
+def test_denoise_runs_saves_partitions_one_at_a_time(inference_parameters, tmp_path):
+    for run in ["00001", "00002", "00003"]:
+        write_noise(tmp_path / f"histograms_Run{run}.root", n_events=2, size=32)
+    parameters = {**inference_parameters, "noise_files": str(tmp_path / "*.root")}
+    partitions = PartitionedDataset(
+        path=str(tmp_path / "denoised"), dataset="pickle.PickleDataset"
+    )
+
+    denoised, report = denoise_runs(IdentityModel(), parameters)
+    partitions.save(denoised)
+
+    assert sorted(report) == sorted(denoised)
+    loaded = partitions.load()
+    assert sorted(loaded) == sorted(denoised)
+    assert all(load().shape == (2, 32, 32) for load in loaded.values())
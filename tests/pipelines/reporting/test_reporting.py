@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cygunet.pipelines.reporting.nodes import (
+    TRACK_FEATURES,
+    extract_run_track_features,
+    extract_track_features,
+    plot_track_features,
+    track_features,
+)
+
+
+@pytest.fixture
+def images():
+    images = np.zeros((3, 20, 30), dtype=np.int16)
+    images[0, 2:4, 5:15] = 10  # horizontal track, 2 x 10 pixels
+    images[0, 15, 25] = 7  # single pixel
+    # Same position as the first track of event 0, must not be merged with it
+    images[1, 2:4, 5:15] = 5
+    images[2, 5:15, 8] = 3  # vertical track, 10 x 1 pixels
+    return images
+
+
+@pytest.fixture
+def parameters():
+    return {"threshold": 0, "min_pixels": 2, "batch_size": 2}
+
+
+def test_track_features(images):
+    features = pd.DataFrame(track_features(images))
+
+    assert features["event"].tolist() == [0, 0, 1, 2]
+    assert features["track"].tolist() == [0, 1, 0, 0]
+    assert features["pixels"].tolist() == [20, 1, 20, 10]
+    assert features["intensity"].tolist() == [200, 7, 100, 30]
+    first = features.iloc[0]
+    assert (first["x_min"], first["x_max"], first["y_min"], first["y_max"]) == (
+        5,
+        14,
+        2,
+        3,
+    )
+    assert first["x_barycentre"] == pytest.approx(9.5)
+    assert first["y_barycentre"] == pytest.approx(2.5)
+    assert first["principal_axis_length"] == pytest.approx(10)
+    assert features.iloc[3]["principal_axis_length"] == pytest.approx(10)
+    assert features.iloc[1]["principal_axis_length"] == pytest.approx(1)
+
+
+def test_track_features_does_not_connect_events():
+    images = np.ones((2, 4, 4))
+    features = track_features(images)
+    assert features["event"].tolist() == [0, 1]
+    assert features["pixels"].tolist() == [16, 16]
+
+
+def test_extract_track_features_batches_and_filters(images, parameters):
+    features = extract_track_features(images, parameters)
+
+    assert features["event"].tolist() == [0, 1, 2]
+    pd.testing.assert_frame_equal(
+        features, extract_track_features(images, {**parameters, "batch_size": 3})
+    )
+
+
+def test_reporting_nodes(images, parameters):
+    clean = extract_track_features(images, parameters)
+    denoised = extract_run_track_features(
+        {"cam_00002": lambda: images, "cam_00001": images}, parameters
+    )
+
+    assert denoised["run"].tolist() == ["cam_00001"] * 3 + ["cam_00002"] * 3
+    fig = plot_track_features(clean, denoised)
+    assert len(fig.data) == 6
+
+
+def test_extract_track_features_of_empty_input(parameters):
+    features = extract_track_features(np.zeros((0, 20, 30)), parameters)
+    assert features.empty
+    assert features.columns.tolist() == TRACK_FEATURES
+
+    denoised = extract_run_track_features({}, parameters)
+    assert denoised.empty
+    assert denoised.columns.tolist() == ["run", *TRACK_FEATURES]
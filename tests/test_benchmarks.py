@@ -0,0 +1,61 @@
+from benchmarks.__main__ import main
+from benchmarks.suite import compare, run_suite
+
+
+def test_run_suite():
+    results = run_suite({"tiny": (4, 32)}, repeat=1)
+
+    assert "generate_data" in results["tiny"]
+    assert {"sequential_load_noise_files", "bulk_load_noise_files"} <= set(
+        results["tiny"]
+    )
+    assert all(r["seconds"] > 0 for r in results["tiny"].values())
+
+
+def test_compare_flags_regressions():
+    baseline = {"tiny": {"fast": {"seconds": 1.0}, "slow": {"seconds": 1.0}}}
+    results = {
+        "tiny": {
+            "fast": {"seconds": 1.1},
+            "slow": {"seconds": 2.0},
+            "new": {"seconds": 5.0},
+        }
+    }
+    assert compare(results, baseline, tolerance=1.5) == [("tiny", "slow", 2.0)]
+
+
+def test_main_saves_and_compares_baseline(tmp_path, mocker):
+    mocker.patch("benchmarks.__main__.SIZES", {"small": (4, 32)})
+    mocker.patch("benchmarks.suite._time", return_value=0.01)
+    baseline = tmp_path / "baseline.json"
+
+    assert (
+        main(
+            [
+                "--sizes",
+                "small",
+                "--repeat",
+                "1",
+                "--baseline",
+                str(baseline),
+                "--save-baseline",
+            ]
+        )
+        == 0
+    )
+    assert baseline.exists()
+    assert (
+        main(
+            [
+                "--sizes",
+                "small",
+                "--repeat",
+                "1",
+                "--baseline",
+                str(baseline),
+                "--tolerance",
+                "1000",
+            ]
+        )
+        == 0
+    )
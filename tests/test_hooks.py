@@ -0,0 +1,125 @@
+import json
+import pstats
+import sys
+
+import numpy as np
+import pytest
+from cygunet.datasets import CygnoSimulationImage
+from cygunet.hooks import PerformanceHooks, SparkHooks
+from kedro.framework.hooks import _create_hook_manager
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.pipeline import node, pipeline
+from kedro.runner import SequentialRunner
+
+
+def _double(x):
+    return x * 2
+
+
+@pytest.fixture
+def run_with_hooks(tmp_path):
+    def run(hooks):
+        hook_manager = _create_hook_manager()
+        hook_manager.register(hooks)
+        catalog = DataCatalog({"x": MemoryDataset(np.ones(1000)), "y": MemoryDataset()})
+        demo = pipeline([node(_double, "x", "y", name="double_node")])
+        run_params = {"session_id": "test-session", "pipeline_name": "demo"}
+
+        hooks.before_pipeline_run(run_params=run_params)
+        SequentialRunner().run(demo, catalog, hook_manager)
+        hooks.after_pipeline_run(run_params=run_params)
+        with open(tmp_path / "test-session.json") as f:
+            return json.load(f)
+
+    return run
+
+
+def test_performance_report(tmp_path, run_with_hooks):
+    report = run_with_hooks(PerformanceHooks(output_dir=str(tmp_path)))
+
+    assert report["status"] == "success"
+    assert report["pipeline_name"] == "demo"
+    node_record = report["nodes"]["double_node"]
+    assert node_record["wall_time_s"] >= 0
+    assert node_record["output_bytes"] == 8000
+    assert report["datasets"]["x"]["load"][0]["bytes"] == 8000
+    assert report["datasets"]["y"]["save"][0]["node"] == "double_node"
+    assert report["profiles"] == {}
+
+
+def _load_file(x):
+    return len(x)
+
+
+def test_performance_report_names_runner_and_file_sizes(tmp_path, simulation_file):
+    hooks = PerformanceHooks(output_dir=str(tmp_path))
+    hook_manager = _create_hook_manager()
+    hook_manager.register(hooks)
+    catalog = DataCatalog(
+        {"x": CygnoSimulationImage(str(simulation_file)), "y": MemoryDataset()}
+    )
+    run_params = {"session_id": "test-session", "runner": str(SequentialRunner())}
+
+    hooks.after_catalog_created(catalog=catalog)
+    hooks.before_pipeline_run(run_params=run_params)
+    SequentialRunner().run(
+        pipeline([node(_load_file, "x", "y")]), catalog, hook_manager
+    )
+    hooks.after_pipeline_run(run_params=run_params)
+    with open(tmp_path / "test-session.json") as f:
+        report = json.load(f)
+
+    assert report["runner"] == "SequentialRunner"
+    assert (
+        report["datasets"]["x"]["load"][0]["file_bytes"]
+        == simulation_file.stat().st_size
+    )
+    assert "file_bytes" not in report["datasets"]["y"]["save"][0]
+
+
+def test_performance_report_profiles_nodes(tmp_path, run_with_hooks):
+    report = run_with_hooks(
+        PerformanceHooks(output_dir=str(tmp_path), profile_nodes=["double_node"])
+    )
+
+    stats = pstats.Stats(report["profiles"]["double_node"])
+    assert any(func[2] == "_double" for func in stats.stats)
+
+
+def test_spark_session_is_only_created_for_spark_nodes(mocker):
+    builder = mocker.patch("pyspark.sql.SparkSession.builder")
+    hooks = SparkHooks()
+
+    hooks.before_node_run(node=node(_double, "x", "y", name="local_node"))
+    builder.config.assert_not_called()
+
+    hooks.before_node_run(node=node(_double, "x", "y", name="spark_node", tags="spark"))
+    builder.config.return_value.getOrCreate.assert_called_once()
+
+
+def _fail(x):
+    raise ValueError("boom")
+
+
+def test_performance_report_records_failed_nodes(tmp_path):
+    hooks = PerformanceHooks(output_dir=str(tmp_path), profile_nodes=["fail_node"])
+    hook_manager = _create_hook_manager()
+    hook_manager.register(hooks)
+    catalog = DataCatalog({"x": MemoryDataset(1), "y": MemoryDataset()})
+    failing = pipeline([node(_fail, "x", "y", name="fail_node")])
+    run_params = {"session_id": "test-session", "runner": "ParallelRunner"}
+
+    hooks.before_pipeline_run(run_params=run_params)
+    with pytest.raises(ValueError):
+        SequentialRunner().run(failing, catalog, hook_manager)
+    hooks.on_pipeline_error(error=ValueError("boom"), run_params=run_params)
+    with open(tmp_path / "test-session.json") as f:
+        report = json.load(f)
+
+    # The profiler of the failed node is no longer active
+    assert sys.getprofile() is None
+    assert report["status"] == "error"
+    assert report["nodes"]["fail_node"]["status"] == "error"
+    assert "boom" in report["nodes"]["fail_node"]["error"]
+    assert "fail_node" in report["profiles"]
+    assert report["nodes_recorded"] is False
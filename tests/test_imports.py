@@ -0,0 +1,83 @@
+"""Guards the import cost of the project modules.
+
+Every ``kedro run`` and every worker process imports the settings, the
+datasets and all pipeline definitions, and creates a session context which
+fires the project hooks, so these must not pull in heavy libraries that are
+only needed once a node actually runs.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+HEAVY_MODULES = [
+    "h5py",
+    "matplotlib",
+    "pandas",
+    "plotly",
+    "pyspark",
+    "seaborn",
+    "sklearn",
+    "uproot",
+]
+# Seconds spent on top of importing kedro itself, ~2.8s when the heavy
+# modules were imported eagerly.
+IMPORT_BUDGET = 1.0
+
+MEASURE = """
+import json, sys, time
+from kedro.framework.project import configure_project, find_pipelines
+
+start = time.perf_counter()
+import cygunet.datasets
+import cygunet.settings
+configure_project("cygunet")
+find_pipelines()
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+CREATE_CONTEXT = """
+import json, sys
+from pathlib import Path
+from kedro.framework.session import KedroSession
+from kedro.framework.startup import bootstrap_project
+
+bootstrap_project(Path.cwd())
+with KedroSession.create(project_path=Path.cwd()) as session:
+    session.load_context()
+print(json.dumps({"modules": sorted(sys.modules)}))
+"""
+
+PROJECT_PATH = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def measurement():
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", HEAVY_MODULES)
+def test_heavy_modules_are_not_imported(measurement, module):
+    assert module not in measurement["modules"]
+
+
+def test_import_time_budget(measurement):
+    assert measurement["seconds"] < IMPORT_BUDGET
+
+
+def test_session_context_does_not_start_spark():
+    result = subprocess.run(
+        [sys.executable, "-c", CREATE_CONTEXT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=PROJECT_PATH,
+    )
+    modules = json.loads(result.stdout.strip().splitlines()[-1])["modules"]
+    assert "pyspark" not in modules
+    assert "py4j" not in modules
@@ -0,0 +1,19 @@
+from cygunet.pipeline_registry import register_pipelines
+from kedro.framework.project import configure_project
+
+
+def _node_names(pipeline):
+    return {node.name for node in pipeline.nodes}
+
+
+def test_spark_generation_is_registered_separately():
+    configure_project("cygunet")
+    pipelines = register_pipelines()
+
+    assert "generate_data_spark_node" not in _node_names(pipelines["__default__"])
+    assert "generate_data_spark_node" not in _node_names(pipelines["data_processing"])
+    assert _node_names(pipelines["data_processing_spark"]) == {
+        "validate_inputs_node",
+        "generate_data_spark_node",
+    }
+    assert "generate_data_node" in _node_names(pipelines["__default__"])